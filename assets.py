@@ -0,0 +1,208 @@
+"""Estáticos con huella: build y helpers de runtime.
+
+Build (en el Dockerfile, o a mano tras tocar un .css):
+
+    python assets.py
+
+copia cada archivo de static/ (menos uploads/ y la propia salida) a
+static/dist/ con el hash del contenido en el nombre (style.css ->
+style.1a2b3c4d.css), deja al lado las versiones .gz y .br (esta última solo
+si está instalado el paquete brotli, que es opcional) y escribe
+static/dist/manifest.json. Antes descarga Chart.js (versión fija) a
+static/vendor/ si aún no está, para no depender del CDN en cada visita; ese
+directorio no se versiona. Si la descarga falla el build falla: con
+--no-vendor se omite a propósito y las páginas cargan Chart.js del CDN.
+
+Runtime: asset_url("style.css") (global de Jinja, ver templating.py) da la
+URL con huella si hay manifiesto, o /static/style.css si no se ha hecho el
+build (desarrollo). AssetFiles sirve /static: lo que tiene huella lleva
+Cache-Control immutable de un año y, si el cliente lo acepta, se entrega la
+variante precomprimida.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import stat
+import urllib.request
+from urllib.parse import quote
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+
+STATIC_DIR = "static"
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST = os.path.join(DIST_DIR, "manifest.json")
+SKIP_DIRS = {"dist", "uploads"}
+
+CHARTJS_VERSION = "4.5.0"
+CHARTJS_PATH = "vendor/chart.umd.min.js"
+CHARTJS_CDN = f"https://cdn.jsdelivr.net/npm/chart.js@{CHARTJS_VERSION}/dist/chart.umd.min.js"
+
+# Sin build o con --no-vendor, el archivo no está y se usa el CDN
+FALLBACKS = {CHARTJS_PATH: CHARTJS_CDN}
+
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt", ".html"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Fotos subidas: ya se nombran por su sha256 (uploads.py), así que tampoco cambian
+_CONTENT_ADDRESSED = re.compile(r"^uploads/(thumbs/)?[0-9a-f]{64}\.\w+$")
+
+
+# ============================================================
+# BUILD
+# ============================================================
+
+def vendor_chartjs():
+    """Descarga Chart.js (versión fija) si todavía no está en static/vendor/."""
+    target = os.path.join(STATIC_DIR, CHARTJS_PATH)
+    if os.path.exists(target):
+        return False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with urllib.request.urlopen(CHARTJS_CDN, timeout=30) as response, open(target + ".part", "wb") as out:
+        shutil.copyfileobj(response, out)
+    os.replace(target + ".part", target)
+    return True
+
+
+def _sources():
+    for root, dirs, files in os.walk(STATIC_DIR):
+        rel_root = os.path.relpath(root, STATIC_DIR)
+        if rel_root == ".":
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in files:
+            yield os.path.normpath(os.path.join(rel_root, name)).replace(os.sep, "/")
+
+
+def _compress(path: str, data: bytes):
+    with open(path + ".gz", "wb") as out:
+        # mtime=0: mismo .gz en cada build, no cambia el ETag
+        out.write(gzip.compress(data, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return
+    with open(path + ".br", "wb") as out:
+        out.write(brotli.compress(data, quality=11))
+
+
+def build():
+    """Genera static/dist/ y el manifiesto. Devuelve el manifiesto."""
+    shutil.rmtree(DIST_DIR, ignore_errors=True)
+    os.makedirs(DIST_DIR)
+
+    manifest = {}
+    for rel in sorted(_sources()):
+        with open(os.path.join(STATIC_DIR, rel), "rb") as f:
+            data = f.read()
+        stem, ext = os.path.splitext(rel)
+        hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:8]}{ext}"
+
+        target = os.path.join(DIST_DIR, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as out:
+            out.write(data)
+        if ext.lower() in COMPRESSIBLE:
+            _compress(target, data)
+        manifest[rel] = "dist/" + hashed
+
+    with open(MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+# ============================================================
+# RUNTIME
+# ============================================================
+
+_manifest = None
+
+
+def manifest() -> dict:
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST, encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except FileNotFoundError:
+            _manifest = {}
+    return _manifest
+
+
+def asset_url(path: str) -> str:
+    """URL de un estático (path relativo a static/)."""
+    hashed = manifest().get(path)
+    if hashed:
+        return "/static/" + quote(hashed)
+    if path in FALLBACKS and not os.path.exists(os.path.join(STATIC_DIR, path)):
+        return FALLBACKS[path]
+    return "/static/" + quote(path)
+
+
+class AssetFiles(StaticFiles):
+    """StaticFiles con variantes .br / .gz y Cache-Control immutable para lo que tiene huella."""
+
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+    async def get_response(self, path: str, scope):
+        rel = path.replace(os.sep, "/")
+        immutable = rel.startswith("dist/") or bool(_CONTENT_ADDRESSED.match(rel))
+
+        response = None
+        if rel.startswith("dist/") and scope["method"] in ("GET", "HEAD"):
+            response = await self._precompressed(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        if immutable:
+            response.headers["Cache-Control"] = IMMUTABLE
+        if rel.startswith("dist/") and os.path.splitext(rel)[1].lower() in COMPRESSIBLE:
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    async def _precompressed(self, path: str, scope):
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        accepted = {e.split(";")[0].strip() for e in accept.split(",")}
+        for encoding, suffix in self.ENCODINGS:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            response = self.file_response(full_path, stat_result, scope)
+            response.headers["Content-Encoding"] = encoding
+            if response.status_code == 200:
+                # El tipo es el del original, no application/gzip
+                media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                if media_type.startswith("text/"):
+                    media_type += "; charset=utf-8"
+                response.headers["Content-Type"] = media_type
+            return response
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build de estáticos de DrPoro")
+    parser.add_argument("--no-vendor", action="store_true", help="no descargar Chart.js")
+    args = parser.parse_args()
+
+    if not args.no_vendor:
+        try:
+            if vendor_chartjs():
+                print(f"Chart.js {CHARTJS_VERSION} -> static/{CHARTJS_PATH}")
+        except OSError as exc:
+            raise SystemExit(
+                f"No se pudo descargar Chart.js {CHARTJS_VERSION} de {CHARTJS_CDN} ({exc}).\n"
+                "El build necesita red para esto; --no-vendor lo omite y las páginas usan el CDN."
+            )
+
+    print(f"{len(build())} archivos -> {DIST_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Throughput de las rutas de lectura: ruta sync (threadpool) vs DB_ASYNC=1.
+
+    python benchmarks/bench_async.py [--concurrency 64] [--seconds 5]
+
+Crea una base SQLite temporal con datos de prueba, levanta la app en proceso
+(httpx + ASGITransport, sin red) y lanza peticiones concurrentes contra las
+rutas de lectura con la caché del catálogo desactivada, así se mide el
+acceso a la base. Cada modo corre en un subproceso porque DB_ASYNC se lee al
+importar. Necesita httpx (solo para el benchmark).
+
+Con concurrencia mayor que las conexiones del pool las peticiones sync
+esperan turno en database.get_db (ver pool / sessions en la salida).
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+URLS = ["/champions/", "/champions/7", "/champions/by-name/Champ42", "/champions/list", "/items/"]
+
+
+def seed(db_path):
+    os.environ["POSTGRESQL_ADDON_URI"] = f"sqlite:///{db_path}"
+    sys.path.insert(0, ROOT)
+    import crud
+    from database import SessionLocal, init_db
+
+    init_db()
+    roles = ["Top", "JG", "Mid", "Adc", "Sup"]
+    with SessionLocal() as db:
+        crud.bulk_upsert_champions(db, [
+            dict(nombre=f"Champ{i}", rol=roles[i % 5], tasa_victoria=45 + i % 10,
+                 tasa_seleccion=1, tasa_baneo=1, activo=True)
+            for i in range(170)
+        ])
+        crud.bulk_upsert_items(db, [dict(nombre=f"Item{i}", tipo="", porcentaje_uso=0) for i in range(200)])
+
+
+async def run(concurrency, seconds):
+    import httpx
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    done = 0
+    deadline = time.perf_counter() + seconds
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(n):
+            nonlocal done
+            while time.perf_counter() < deadline:
+                r = await client.get(URLS[n % len(URLS)])
+                assert r.status_code == 200, r.text
+                done += 1
+                n += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    pool = main.database.pool_status()
+    # ASGITransport no lanza los eventos de lifespan: se cierra el engine a mano
+    await main.shutdown_event()
+    return {"requests": done, "req_per_s": round(done / elapsed, 1), "pool": pool}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--child", choices=["sync", "async"])
+    parser.add_argument("--db")
+    args = parser.parse_args()
+
+    if args.child:
+        os.environ["POSTGRESQL_ADDON_URI"] = f"sqlite:///{args.db}"
+        sys.path.insert(0, ROOT)
+        os.chdir(ROOT)
+        print(json.dumps(asyncio.run(run(args.concurrency, args.seconds))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed(db_path)
+
+        for mode in ("sync", "async"):
+            env = dict(os.environ, DB_ASYNC="1" if mode == "async" else "0", CATALOG_CACHE_SIZE="0")
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--db", db_path,
+                 "--concurrency", str(args.concurrency), "--seconds", str(args.seconds)],
+                env=env, capture_output=True, text=True, check=True
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{mode:>5}: {result['req_per_s']:8.1f} req/s ({result['requests']} peticiones, "
+                  f"concurrencia {args.concurrency})")
+            pool = result["pool"][mode]
+            print(f"       espera por conexión: media {pool['wait_avg_ms']} ms, "
+                  f"máx {pool['wait_max_ms']} ms, timeouts {pool['timeouts']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Arranque en frío y primera petición de las páginas HTML.
+
+    python benchmarks/bench_templates.py [--runs 5]
+
+Cada corrida es un proceso nuevo (como un worker recién levantado) que mide:
+importar main, los eventos de startup y la primera y segunda petición a
+cada página. Se compara sin precompilar (TEMPLATES_PRECOMPILE=0), con
+precompilación y caché de bytecode vacía, y con la caché de bytecode ya
+escrita por una corrida anterior. Las cachés de datos y de HTML están
+desactivadas para medir solo las plantillas.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+URLS = ["/", "/champions/list", "/items/", "/cvc/", "/champions/1/view"]
+
+
+def child():
+    started = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    import main
+    from fastapi.testclient import TestClient
+    imported = time.perf_counter()
+
+    result = {"import_ms": (imported - started) * 1000}
+    with TestClient(main.app) as client:
+        result["startup_ms"] = (time.perf_counter() - imported) * 1000
+        for label in ("first", "second"):
+            total = 0.0
+            for url in URLS:
+                t = time.perf_counter()
+                assert client.get(url).status_code == 200, url
+                total += time.perf_counter() - t
+            result[f"{label}_requests_ms"] = total * 1000
+    result["ready_ms"] = result["import_ms"] + result["startup_ms"] + result["first_requests_ms"]
+    print(json.dumps(result))
+
+
+def seed(env):
+    code = (
+        "import crud\n"
+        "from database import SessionLocal, init_db\n"
+        "init_db()\n"
+        "with SessionLocal() as db:\n"
+        "    crud.bulk_upsert_champions(db, [dict(nombre=f'Champ{i}', rol='Mid', tasa_victoria=50,"
+        " tasa_seleccion=1, tasa_baneo=1, activo=True) for i in range(170)])\n"
+        "    crud.bulk_upsert_items(db, [dict(nombre=f'Item{i}', tipo='', porcentaje_uso=0) for i in range(200)])\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True, capture_output=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_env = dict(
+            os.environ,
+            POSTGRESQL_ADDON_URI=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            CATALOG_CACHE_SIZE="0",
+            PAGE_CACHE_BYTES="0",
+            TEMPLATES_BYTECODE_DIR=os.path.join(tmp, "jinja"),
+        )
+        seed(base_env)
+
+        modes = {
+            "sin precompilar": dict(TEMPLATES_PRECOMPILE="0", TEMPLATES_BYTECODE_DIR=""),
+            "precompilado, bytecode frío": dict(TEMPLATES_PRECOMPILE="1"),
+            "precompilado, bytecode caliente": dict(TEMPLATES_PRECOMPILE="1"),
+        }
+        for mode, extra in modes.items():
+            runs = []
+            for _ in range(args.runs):
+                if mode.endswith("frío"):
+                    shutil.rmtree(base_env["TEMPLATES_BYTECODE_DIR"], ignore_errors=True)
+                out = subprocess.run(
+                    [sys.executable, __file__, "--child"], env=dict(base_env, **extra),
+                    capture_output=True, text=True, check=True
+                )
+                runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+            med = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+            print(f"{mode:>32}: import {med['import_ms']:6.1f} ms | startup {med['startup_ms']:6.1f} ms | "
+                  f"1ª petición {med['first_requests_ms']:6.1f} ms | 2ª {med['second_requests_ms']:5.1f} ms | "
+                  f"listo {med['ready_ms']:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
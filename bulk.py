@@ -0,0 +1,170 @@
+"""Importación masiva de campeones, ítems, builds y matchups.
+
+Desde la terminal:
+
+    python bulk.py champions campeones.csv
+    python bulk.py matchups matchups.jsonl --chunk-size 5000
+
+o por HTTP con POST /bulk/{entity} (ver routers/bulk.py).
+
+Los archivos se leen fila a fila (CSV con cabecera o JSON Lines), cada fila
+se valida con el schema correspondiente y las válidas se escriben por lotes,
+un commit por lote.
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+import crud, models, schemas
+
+ENTITIES = {
+    "champions": (schemas.ChampionCreate, crud.bulk_upsert_champions),
+    "items": (schemas.ItemCreate, crud.bulk_upsert_items),
+    "builds": (schemas.ChampionItemCreate, crud.bulk_upsert_champion_items),
+    "matchups": (schemas.CVCCreate, crud.bulk_upsert_cvc),
+}
+
+# Claves foráneas que se comprueban antes de escribir: SQLite (la base por
+# defecto) no las hace cumplir y una build huérfana rompe el arranque
+REFERENCES = {
+    "builds": {"champion_id": models.Champion, "item_id": models.Item},
+    "matchups": {"champion_id": models.Champion, "oponente_id": models.Champion},
+}
+
+FORMATS = ("csv", "jsonl")
+
+# Se guardan como mucho estas filas rechazadas en el reporte (el total sí es exacto)
+MAX_REJECTED_REPORTED = 100
+
+
+def detect_format(filename: str) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return "jsonl" if ext in (".jsonl", ".ndjson", ".json") else "csv"
+
+
+def read_rows(stream, fmt: str):
+    """Genera (número de línea, fila) sin cargar el archivo entero en memoria.
+
+    En JSON Lines la fila es el texto crudo: se decodifica al validar, así una
+    línea rota se rechaza sin cortar la importación.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # Celdas vacías = campo no informado, que aplique el default del schema
+            yield reader.line_num, {k: v for k, v in row.items() if v not in ("", None)}
+    else:
+        for line_num, line in enumerate(stream, start=1):
+            if line.strip():
+                yield line_num, line
+
+
+def unknown_references(db, entity: str, rows):
+    """Por cada fila, el primer campo que apunta a un id que no existe (o None)."""
+    refs = REFERENCES.get(entity, {})
+    wanted = {}
+    for field, model in refs.items():
+        wanted.setdefault(model, set()).update(row[field] for row in rows)
+
+    # Una query por tabla referenciada y lote
+    known = {
+        model: set(db.scalars(select(model.id).where(model.id.in_(ids))))
+        for model, ids in wanted.items()
+    }
+    return [
+        next((field for field, model in refs.items() if row[field] not in known[model]), None)
+        for row in rows
+    ]
+
+
+def import_stream(db, entity: str, stream, fmt: str = "csv", chunk_size: int = 1000) -> dict:
+    schema, writer = ENTITIES[entity]
+    rows = read_rows(stream, fmt)
+
+    started = time.perf_counter()
+    processed = imported = 0
+    rejected = []
+    rejected_count = 0
+
+    def reject(line, error, count=1):
+        nonlocal rejected_count
+        rejected_count += count
+        if len(rejected) < MAX_REJECTED_REPORTED:
+            rejected.append({"line": line, "error": error})
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        lines, valid = [], []
+        for line_num, raw in chunk:
+            processed += 1
+            try:
+                data = json.loads(raw) if isinstance(raw, str) else raw
+                valid.append(schema(**data).dict())
+                lines.append(line_num)
+            except (ValueError, TypeError) as e:
+                # pydantic.ValidationError y JSONDecodeError heredan de ValueError
+                reject(line_num, str(e))
+
+        if entity in REFERENCES and valid:
+            checked = []
+            for line_num, row, field in zip(lines, valid, unknown_references(db, entity, valid)):
+                if field:
+                    reject(line_num, f"{field}={row[field]} no existe")
+                elif entity == "matchups" and row["champion_id"] == row["oponente_id"]:
+                    reject(line_num, "un campeón no puede enfrentarse a sí mismo")
+                else:
+                    checked.append(row)
+            valid = checked
+
+        if not valid:
+            continue
+
+        try:
+            imported += writer(db, valid)
+        except IntegrityError as e:
+            # Alguna restricción de la base que no se comprueba arriba: se
+            # descarta el lote entero
+            db.rollback()
+            reject(f"{chunk[0][0]}-{chunk[-1][0]}", str(e.orig), count=len(valid))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "entity": entity,
+        "processed": processed,
+        "imported": imported,
+        "rejected_count": rejected_count,
+        "rejected": rejected,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(processed / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importación masiva para DrPoro")
+    parser.add_argument("entity", choices=sorted(ENTITIES))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from database import SessionLocal, init_db
+    init_db()
+
+    fmt = args.format or detect_format(args.path)
+    with open(args.path, encoding="utf-8", newline="") as stream, SessionLocal() as db:
+        report = import_stream(db, args.entity, stream, fmt, args.chunk_size)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
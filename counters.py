@@ -0,0 +1,82 @@
+import heapq
+import os
+from collections import defaultdict
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload
+
+import models
+
+TOP_K = int(os.getenv("COUNTERS_TOP_K", "5"))
+ROLES = ["Top", "JG", "Mid", "Adc", "Sup"]
+
+
+def rebuild(db: Session, champion_ids):
+    """Recalcula los counters de los campeones indicados.
+
+    No hace commit: se llama dentro de la misma transacción que escribió los
+    matchups, así la tabla materializada nunca queda a medias.
+    """
+    champion_ids = set(champion_ids)
+    if not champion_ids:
+        return
+
+    cvc = models.ChampionVsChampion
+    matchups = defaultdict(list)
+    rows = (
+        db.query(cvc.champion_id, cvc.oponente_id, cvc.winrate, models.Champion.rol)
+        .join(models.Champion, models.Champion.id == cvc.oponente_id)
+        .filter(cvc.champion_id.in_(champion_ids))
+    )
+    for champion_id, oponente_id, winrate, rol in rows:
+        matchups[champion_id].append((winrate, oponente_id, rol))
+
+    nuevas = []
+    for champion_id in champion_ids:
+        todos = matchups.get(champion_id, [])
+        for rol in [""] + ROLES:
+            grupo = [m for m in todos if not rol or m[2] == rol]
+            counters = heapq.nsmallest(TOP_K, (m for m in grupo if m[0] < 50))
+            victimas = heapq.nlargest(TOP_K, (m for m in grupo if m[0] > 50))
+
+            for tipo, lista in (("counter", counters), ("victima", victimas)):
+                nuevas.extend(
+                    {"champion_id": champion_id, "tipo": tipo, "rol": rol, "posicion": pos,
+                     "oponente_id": oponente_id, "winrate": winrate}
+                    for pos, (winrate, oponente_id, _) in enumerate(lista)
+                )
+
+    db.query(models.ChampionCounter).filter(
+        models.ChampionCounter.champion_id.in_(champion_ids)
+    ).delete(synchronize_session=False)
+    if nuevas:
+        db.execute(insert(models.ChampionCounter), nuevas)
+
+
+def rebuild_all(db: Session):
+    rebuild(db, [c.id for c in db.query(models.Champion.id)])
+
+
+def ensure_built(db: Session):
+    """Primer arranque tras añadir la tabla: se materializa lo que ya había."""
+    if db.query(models.ChampionCounter.id).first() is None and db.query(models.ChampionVsChampion.id).first():
+        rebuild_all(db)
+        db.commit()
+
+
+def get_counters(db: Session, champion_id: int, rol: str = "", k: int = TOP_K):
+    rows = (
+        db.query(models.ChampionCounter)
+        .options(joinedload(models.ChampionCounter.oponente))
+        .filter(
+            models.ChampionCounter.champion_id == champion_id,
+            models.ChampionCounter.rol == (rol or ""),
+            models.ChampionCounter.posicion < k
+        )
+        .order_by(models.ChampionCounter.tipo, models.ChampionCounter.posicion)
+        .all()
+    )
+    return {
+        "counters": [r for r in rows if r.tipo == "counter"],
+        "victimas": [r for r in rows if r.tipo == "victima"],
+    }
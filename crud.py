@@ -1,8 +1,80 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy import func, inspect, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from typing import List, Optional
-import models, schemas
+import models, schemas, search, counters, draft, pagination, leaderboard, history, recommend
 from models import Champion
+from cache import catalog_cache
+from http_cache import versions
+
+
+
+# CACHÉ DE CATÁLOGO
+#
+# Se guardan copias "planas" (solo columnas) de los objetos, nunca las
+# instancias de otra sesión. Al leer de la caché se vuelven a enlazar a la
+# sesión actual con merge(load=False), sin emitir SQL, así el llamador puede
+# modificarlas y hacer commit igual que con un objeto recién consultado.
+
+
+def _snapshot(obj):
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def _rehydrate(db: Session, model, row: dict):
+    key = identity_key(model, row["id"])
+    if key in db.identity_map:
+        return db.identity_map[key]
+
+    obj = model(**row)
+    make_transient_to_detached(obj)
+    return db.merge(obj, load=False)
+
+
+def _cached_one(db: Session, model, key, loader):
+    row = catalog_cache.get(key)
+    if row is None:
+        obj = loader()
+        if obj is not None:
+            catalog_cache.set(key, _snapshot(obj))
+        return obj
+    return _rehydrate(db, model, row)
+
+
+def _cached_list(db: Session, model, key, loader):
+    rows = catalog_cache.get(key)
+    if rows is None:
+        objs = loader()
+        catalog_cache.set(key, [_snapshot(o) for o in objs])
+        return objs
+    return [_rehydrate(db, model, row) for row in rows]
+
+
+def _upsert(db: Session, model):
+    # INSERT ... ON CONFLICT existe en Postgres y SQLite, pero cada uno con su dialecto
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model.__table__)
+    return sqlite.insert(model.__table__)
+
+
+def _champions_changed(*champions):
+    catalog_cache.invalidate("champions")
+    versions.bump("champions", *(c.id for c in champions))
+    for champion in champions:
+        search.index("champions", champion.id, champion.nombre)
+        draft.matrix.set_champion(champion.id, champion.nombre, champion.rol, champion.activo)
+    recommend.index.set_champions((c.id, c.rol, c.activo) for c in champions)
+    leaderboard.mark_dirty()
+
+
+def _items_changed(*items):
+    catalog_cache.invalidate("items")
+    versions.bump("items", *(i.id for i in items))
+    for item in items:
+        search.index("items", item.id, item.nombre)
+    recommend.index.set_items((i.id, i.nombre, i.activo) for i in items)
+    leaderboard.mark_dirty()
 
 
 
@@ -10,30 +82,117 @@ from models import Champion
 
 
 def get_champion(db: Session, champion_id: int):
-    return db.query(models.Champion).filter(models.Champion.id == champion_id).first()
+    return _cached_one(
+        db, models.Champion, ("champions", "get", champion_id),
+        lambda: db.query(models.Champion).filter(models.Champion.id == champion_id).first()
+    )
+
+
+def get_champion_detail(db: Session, champion_id: int, top_k: int = 5):
+    """Todo lo que necesita la página de detalle, en un número fijo de queries."""
+    champion = (
+        db.query(models.Champion)
+        .options(joinedload(models.Champion.profile))
+        .filter(models.Champion.id == champion_id)
+        .first()
+    )
+    if not champion:
+        return None
+
+    items_con_porcentaje = (
+        db.query(models.ChampionItem, models.Item)
+        .join(models.Item, models.Item.id == models.ChampionItem.item_id)
+        .filter(models.ChampionItem.champion_id == champion_id)
+        .order_by(models.ChampionItem.porcentaje_uso.desc())
+        .all()
+    )
+
+    enfrentamientos = (
+        db.query(models.ChampionVsChampion)
+        .options(joinedload(models.ChampionVsChampion.oponente))
+        .filter(models.ChampionVsChampion.champion_id == champion_id)
+        .order_by(models.ChampionVsChampion.winrate.desc())
+        .all()
+    )
+
+    return {
+        "champion": champion,
+        "items_con_porcentaje": items_con_porcentaje,
+        "enfrentamientos": enfrentamientos,
+        # counters / victimas vienen de la tabla materializada: O(K)
+        **counters.get_counters(db, champion_id, k=top_k),
+    }
 
 
 def get_champion_by_name(db: Session, nombre: str):
     return db.query(models.Champion).filter(models.Champion.nombre == nombre).first()
 
 
-def list_champions(db: Session, skip: int = 0, limit: int = 100, include_inactive: bool = False, rol: str = None):
-    q = db.query(models.Champion)
+def list_champions(db: Session, skip: int = 0, limit: int = 100, include_inactive: bool = False, rol: str = None,
+                   after: Optional[tuple] = None):
+    # after = (id,) de la última fila de la página anterior (ver pagination.py);
+    # skip queda por compatibilidad y solo se aplica sin cursor.
+    def loader():
+        q = db.query(models.Champion)
+
+        if not include_inactive:
+            q = q.filter(models.Champion.activo == True)
+
+        if rol:
+            q = q.filter(models.Champion.rol == rol)
+
+        q = pagination.after(q, [models.Champion.id], after)
+        if after is None and skip:
+            q = q.offset(skip)
+        return q.order_by(models.Champion.id).limit(limit).all()
+
+    key = ("champions", "list", skip, limit, include_inactive, rol, after)
+    return _cached_list(db, models.Champion, key, loader)
 
-    if not include_inactive:
-        q = q.filter(models.Champion.activo == True)
 
-    if rol:
-        q = q.filter(models.Champion.rol == rol)
+def list_deleted_champions(db: Session, skip: int = 0, limit: int = 100, after: Optional[tuple] = None):
+    # Solo los desactivados (soft delete), filtrados en SQL
+    def loader():
+        q = db.query(models.Champion).filter(models.Champion.activo == False)
+        q = pagination.after(q, [models.Champion.id], after)
+        if after is None and skip:
+            q = q.offset(skip)
+        return q.order_by(models.Champion.id).limit(limit).all()
 
-    return q.offset(skip).limit(limit).all()
+    key = ("champions", "deleted", skip, limit, after)
+    return _cached_list(db, models.Champion, key, loader)
+
+
+def get_champions_by_ids(db: Session, ids: List[int]):
+    # Devuelve en el mismo orden que ids (p. ej. el ranking de la búsqueda)
+    if not ids:
+        return []
+    by_id = {c.id: c for c in db.query(models.Champion).filter(models.Champion.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def list_champion_names(db: Session):
+    # Solo (id, nombre): suficiente para los <select> de los formularios y filtros.
+    # Las filas (Row) no están ligadas a la sesión, se cachean tal cual.
+    key = ("champions", "names")
+    rows = catalog_cache.get(key)
+    if rows is None:
+        rows = (
+            db.query(models.Champion.id, models.Champion.nombre)
+            .order_by(models.Champion.nombre)
+            .all()
+        )
+        catalog_cache.set(key, rows)
+    return rows
 
 
 def create_champion(db: Session, champion: schemas.ChampionCreate):
     db_champion = models.Champion(**champion.dict())
     db.add(db_champion)
+    history.record_champions(db, [db_champion])
     db.commit()
     db.refresh(db_champion)
+    _champions_changed(db_champion)
     return db_champion
 
 
@@ -43,8 +202,19 @@ def update_champion(db: Session, db_champion: models.Champion, champion_update:
     for key, value in update_data.items():
         setattr(db_champion, key, value)
 
+    if "rol" in update_data:
+        # Los counters por rol de quienes se enfrentan a este campeón cambian
+        db.flush()
+        rivales = db.query(models.ChampionVsChampion.champion_id).filter(
+            models.ChampionVsChampion.oponente_id == db_champion.id
+        )
+        counters.rebuild(db, [r.champion_id for r in rivales])
+
+    if update_data.keys() & set(history.STATS):
+        history.record_champions(db, [db_champion])
     db.commit()
     db.refresh(db_champion)
+    _champions_changed(db_champion)
     return db_champion
 
 
@@ -57,6 +227,7 @@ def soft_delete_champion(db: Session, champion_id: int):
     db.add(db_champ)
     db.commit()
     db.refresh(db_champ)
+    _champions_changed(db_champ)
     return db_champ
 
 
@@ -73,6 +244,7 @@ def create_item(db: Session, item: schemas.ItemCreate):
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    _items_changed(db_item)
     return db_item
 
 
@@ -80,13 +252,28 @@ def get_item(db: Session, item_id: int):
     return db.query(models.Item).filter(models.Item.id == item_id).first()
 
 
-def list_items(db: Session, skip: int = 0, limit: int = 100, include_inactive: bool = False):
-    q = db.query(models.Item)
+def get_items_by_ids(db: Session, ids: List[int]):
+    if not ids:
+        return []
+    by_id = {i.id: i for i in db.query(models.Item).filter(models.Item.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def list_items(db: Session, skip: int = 0, limit: int = 100, include_inactive: bool = False,
+               after: Optional[tuple] = None):
+    def loader():
+        q = db.query(models.Item)
 
-    if not include_inactive:
-        q = q.filter(models.Item.activo == True)
+        if not include_inactive:
+            q = q.filter(models.Item.activo == True)
 
-    return q.offset(skip).limit(limit).all()
+        q = pagination.after(q, [models.Item.id], after)
+        if after is None and skip:
+            q = q.offset(skip)
+        return q.order_by(models.Item.id).limit(limit).all()
+
+    key = ("items", "list", skip, limit, include_inactive, after)
+    return _cached_list(db, models.Item, key, loader)
 
 
 def update_item(db: Session, item_id: int, item_data: schemas.ItemUpdate):
@@ -99,6 +286,7 @@ def update_item(db: Session, item_id: int, item_data: schemas.ItemUpdate):
 
     db.commit()
     db.refresh(item)
+    _items_changed(item)
     return item
 
 
@@ -111,6 +299,7 @@ def soft_delete_item(db: Session, item_id: int):
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    _items_changed(db_item)
     return db_item
 
 
@@ -119,35 +308,42 @@ def soft_delete_item(db: Session, item_id: int):
 
 
 def add_item_to_champion(db: Session, champion_id: int, item_id: int, porcentaje_uso: float = 0.0):
-    exists = db.query(models.ChampionItem).filter(
-        and_(
-            models.ChampionItem.champion_id == champion_id,
-            models.ChampionItem.item_id == item_id
-        )
-    ).first()
-
-    if exists:
-        exists.porcentaje_uso = porcentaje_uso
-        db.commit()
-        db.refresh(exists)
-        return exists
+    # SQLite no hace cumplir las claves foráneas: sin esto quedaría una build huérfana
+    if get_champion(db, champion_id) is None or get_item(db, item_id) is None:
+        return None
 
-    assoc = models.ChampionItem(
-        champion_id=champion_id,
-        item_id=item_id,
-        porcentaje_uso=porcentaje_uso
-    )
-    db.add(assoc)
+    # Un solo INSERT ... ON CONFLICT sobre _champ_item_uc: sin carrera entre
+    # dos peticiones que añaden el mismo par a la vez
+    table = models.ChampionItem.__table__
+    stmt = _upsert(db, models.ChampionItem)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.champion_id, table.c.item_id],
+        set_={"porcentaje_uso": stmt.excluded.porcentaje_uso}
+    ).returning(table.c.id)
+
+    assoc_id = db.execute(stmt, {
+        "champion_id": champion_id,
+        "item_id": item_id,
+        "porcentaje_uso": porcentaje_uso
+    }).scalar_one()
+    history.record_builds(db, [(champion_id, item_id, porcentaje_uso)])
     db.commit()
-    db.refresh(assoc)
-    return assoc
+    versions.bump("builds", champion_id)
+    leaderboard.mark_dirty()
+    recommend.index.refresh(db, [champion_id])
+    return db.get(models.ChampionItem, assoc_id)
 
 
 def get_items_for_champion(db: Session, champion_id: int):
+    # porcentaje_uso es el de la build (champion_items), no el global del ítem
     return (
-        db.query(models.Item)
+        db.query(
+            models.Item.id, models.Item.nombre, models.Item.tipo,
+            models.ChampionItem.porcentaje_uso, models.ChampionItem.muestras
+        )
         .join(models.ChampionItem, models.Item.id == models.ChampionItem.item_id)
         .filter(models.ChampionItem.champion_id == champion_id)
+        .order_by(models.ChampionItem.porcentaje_uso.desc(), models.Item.id)
         .all()
     )
 
@@ -156,28 +352,103 @@ def get_items_for_champion(db: Session, champion_id: int):
 # CVC (Champion vs Champion)
 
 
-def list_cvc(db: Session):
-    return db.query(models.ChampionVsChampion).all()
+def list_cvc(db: Session, champion_id: Optional[int] = None, skip: int = 0, limit: int = 50,
+             after: Optional[tuple] = None):
+    # Campeón y oponente vienen en la misma SELECT (JOIN) para no disparar
+    # dos lazy loads por cada fila al renderizar la tabla.
+    q = db.query(models.ChampionVsChampion).options(
+        joinedload(models.ChampionVsChampion.champion),
+        joinedload(models.ChampionVsChampion.oponente)
+    )
+
+    if champion_id:
+        q = q.filter(models.ChampionVsChampion.champion_id == champion_id)
 
+    q = pagination.after(q, [models.ChampionVsChampion.id], after)
+    if after is None and skip:
+        q = q.offset(skip)
+    return q.order_by(models.ChampionVsChampion.id).limit(limit).all()
 
-def create_cvc(db: Session, champion_id: int, oponente_id: int, winrate: float):
-    cvc = models.ChampionVsChampion(
-        champion_id=champion_id,
-        oponente_id=oponente_id,
-        winrate=winrate
-    )
-    db.add(cvc)
 
-    cvc_op = models.ChampionVsChampion(
-        champion_id=oponente_id,
-        oponente_id=champion_id,
-        winrate=100.0 - winrate
+def count_cvc(db: Session, champion_id: Optional[int] = None):
+    q = db.query(func.count(models.ChampionVsChampion.id))
+
+    if champion_id:
+        q = q.filter(models.ChampionVsChampion.champion_id == champion_id)
+
+    return q.scalar()
+
+
+def _upsert_cvc_rows(db: Session, matchups):
+    """INSERT ... ON CONFLICT de los pares y su espejo, sin commit. Devuelve las filas escritas.
+
+    matchups: (champion_id, oponente_id, winrate) o, desde matches.py,
+    (champion_id, oponente_id, winrate, muestras).
+    """
+    rows = {}
+    for champion_id, oponente_id, winrate, *muestras in matchups:
+        if champion_id == oponente_id:
+            continue
+        extra = {"muestras": muestras[0]} if muestras else {}
+        rows[(champion_id, oponente_id)] = {"champion_id": champion_id, "oponente_id": oponente_id, "winrate": winrate, **extra}
+        rows[(oponente_id, champion_id)] = {"champion_id": oponente_id, "oponente_id": champion_id, "winrate": 100.0 - winrate, **extra}
+
+    if not rows:
+        return rows
+
+    table = models.ChampionVsChampion.__table__
+    stmt = _upsert(db, models.ChampionVsChampion)
+    set_ = {"winrate": stmt.excluded.winrate}
+    if "muestras" in next(iter(rows.values())):
+        set_["muestras"] = stmt.excluded.muestras
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.champion_id, table.c.oponente_id],
+        set_=set_
     )
-    db.add(cvc_op)
+
+    db.execute(stmt, list(rows.values()))
+    counters.rebuild(db, {champion_id for champion_id, _ in rows})
+    history.record_matchups(db, [(r["champion_id"], r["oponente_id"], r["winrate"]) for r in rows.values()])
+    return rows
+
+
+def _cvc_changed(rows):
+    versions.bump("cvc", *{champion_id for champion_id, _ in rows})
+    draft.matrix.set_pairs((r["champion_id"], r["oponente_id"], r["winrate"]) for r in rows.values())
+
+
+def upsert_cvc_many(db: Session, matchups):
+    """Escribe muchos (champion_id, oponente_id, winrate) de una vez.
+
+    Cada par se guarda en los dos sentidos (A vs B = w, B vs A = 100 - w)
+    con un único INSERT ... ON CONFLICT DO UPDATE y un solo commit, así el
+    espejo nunca queda desactualizado. Si el mismo par aparece varias veces
+    (en cualquier sentido) gana el último.
+    """
+    rows = _upsert_cvc_rows(db, matchups)
+    if not rows:
+        return 0
 
     db.commit()
-    db.refresh(cvc)
-    return cvc
+    _cvc_changed(rows)
+    return len(rows)
+
+
+def get_cvc_pair(db: Session, champion_id: int, oponente_id: int):
+    return db.query(models.ChampionVsChampion).filter(
+        models.ChampionVsChampion.champion_id == champion_id,
+        models.ChampionVsChampion.oponente_id == oponente_id
+    ).first()
+
+
+def create_cvc(db: Session, champion_id: int, oponente_id: int, winrate: float):
+    # SQLite no hace cumplir las claves foráneas: sin esto quedaría un matchup huérfano
+    if get_champion(db, champion_id) is None or get_champion(db, oponente_id) is None:
+        return None
+
+    # Si el par ya existía se actualiza (antes fallaba por _champ_opon_uc)
+    upsert_cvc_many(db, [(champion_id, oponente_id, winrate)])
+    return get_cvc_pair(db, champion_id, oponente_id)
 
 
 def get_cvc(db: Session, cvc_id: int):
@@ -191,8 +462,7 @@ def update_cvc(db: Session, cvc_id: int, winrate: float):
     if not registro:
         return None
 
-    registro.winrate = winrate
-    db.commit()
+    upsert_cvc_many(db, [(registro.champion_id, registro.oponente_id, winrate)])
     db.refresh(registro)
     return registro
 
@@ -202,39 +472,80 @@ def delete_cvc(db: Session, cvc_id: int):
     if not registro:
         return None
 
-    db.delete(registro)
+    par = [registro.champion_id, registro.oponente_id]
+
+    # Se borra también el espejo (B vs A) para que el par siga siendo simétrico
+    db.query(models.ChampionVsChampion).filter(
+        models.ChampionVsChampion.champion_id.in_(par),
+        models.ChampionVsChampion.oponente_id.in_(par)
+    ).delete(synchronize_session=False)
+    counters.rebuild(db, par)
     db.commit()
+    versions.bump("cvc", *par)
+    draft.matrix.clear_pairs([(par[0], par[1]), (par[1], par[0])])
     return True
 
 
-def list_champions_by_winrate(db: Session, rol: str | None = None):
-    q = db.query(models.Champion)
-    if rol:
-        q = q.filter(models.Champion.rol == rol)
-    return q.order_by(models.Champion.tasa_victoria.desc()).all()
 
+# USERPROFILE CRUD
 
 
-# USERPROFILE CRUD
+def _favorite_ids(db: Session, profile_id: int) -> set:
+    fav = models.userprofile_favorite_champions
+    return set(db.scalars(select(fav.c.champion_id).where(fav.c.userprofile_id == profile_id)))
+
+
+def _set_favorites(db: Session, profile_id: int, champion_ids, actuales=frozenset()) -> set:
+    """Deja en favoritos exactamente champion_ids (los que existen) y ajusta favoritos_count.
+
+    Solo se escriben las diferencias: un INSERT (executemany) para las altas,
+    un DELETE para las bajas y un UPDATE por sentido del contador. No hace
+    commit. Devuelve los campeones cuyo contador cambió.
+    """
+    pedidos = set(champion_ids or ())
+    if pedidos:
+        pedidos = set(db.scalars(select(models.Champion.id).where(models.Champion.id.in_(pedidos))))
+
+    fav = models.userprofile_favorite_champions
+    altas, bajas = pedidos - actuales, actuales - pedidos
+
+    if bajas:
+        db.execute(fav.delete().where(fav.c.userprofile_id == profile_id, fav.c.champion_id.in_(bajas)))
+    if altas:
+        db.execute(insert(fav), [{"userprofile_id": profile_id, "champion_id": c} for c in altas])
+
+    # favoritos_count + 1 en SQL: dos perfiles a la vez no se pisan el contador
+    for ids, delta in ((altas, 1), (bajas, -1)):
+        if ids:
+            db.execute(
+                update(models.Champion)
+                .where(models.Champion.id.in_(ids))
+                .values(favoritos_count=models.Champion.favoritos_count + delta)
+                .execution_options(synchronize_session=False)
+            )
+    return altas | bajas
+
+
+def _favorites_changed(champion_ids):
+    if champion_ids:
+        catalog_cache.invalidate("champions")
+        versions.bump("champions", *champion_ids)
 
 
 def create_userprofile(db: Session, profile: schemas.UserProfileCreate):
+    """Perfil y favoritos en una sola transacción."""
     db_profile = models.UserProfile(
         nombre_perfil=profile.nombre_perfil,
         nombre_cuenta=profile.nombre_cuenta,
         region=profile.region,
         foto=profile.foto
     )
-
-    if profile.campeones_favoritos_ids:
-        champions = db.query(models.Champion).filter(
-            models.Champion.id.in_(profile.campeones_favoritos_ids)
-        ).all()
-        db_profile.campeones_favoritos = champions
-
     db.add(db_profile)
+    db.flush()
+
+    tocados = _set_favorites(db, db_profile.id, profile.campeones_favoritos_ids)
     db.commit()
-    db.refresh(db_profile)
+    _favorites_changed(tocados)
     return db_profile
 
 
@@ -242,8 +553,21 @@ def get_userprofile(db: Session, profile_id: int):
     return db.query(models.UserProfile).filter(models.UserProfile.id == profile_id).first()
 
 
-def list_userprofiles(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.UserProfile).offset(skip).limit(limit).all()
+def get_userprofile_view(db: Session, profile_id: int):
+    """Perfil con sus favoritos (y sus tasas actuales) en una sola query."""
+    return (
+        db.query(models.UserProfile)
+        .options(joinedload(models.UserProfile.campeones_favoritos))
+        .filter(models.UserProfile.id == profile_id)
+        .first()
+    )
+
+
+def list_userprofiles(db: Session, skip: int = 0, limit: int = 100, after: Optional[tuple] = None):
+    q = pagination.after(db.query(models.UserProfile), [models.UserProfile.id], after)
+    if after is None and skip:
+        q = q.offset(skip)
+    return q.order_by(models.UserProfile.id).limit(limit).all()
 
 
 def update_userprofile(db: Session, profile_id: int, profile_data: schemas.UserProfileCreate):
@@ -256,14 +580,14 @@ def update_userprofile(db: Session, profile_id: int, profile_data: schemas.UserP
     profile.region = profile_data.region
     profile.foto = profile_data.foto
 
+    tocados = set()
     if profile_data.campeones_favoritos_ids is not None:
-        champions = db.query(models.Champion).filter(
-            models.Champion.id.in_(profile_data.campeones_favoritos_ids)
-        ).all()
-        profile.campeones_favoritos = champions
+        tocados = _set_favorites(
+            db, profile.id, profile_data.campeones_favoritos_ids, _favorite_ids(db, profile.id)
+        )
 
     db.commit()
-    db.refresh(profile)
+    _favorites_changed(tocados)
     return profile
 
 
@@ -272,6 +596,151 @@ def delete_userprofile(db: Session, profile_id: int):
     if not profile:
         return None
 
+    tocados = _set_favorites(db, profile.id, (), _favorite_ids(db, profile.id))
     db.delete(profile)
     db.commit()
+    _favorites_changed(tocados)
     return profile
+
+
+
+# CARGA MASIVA
+#
+# Cada función escribe un lote completo con una sola sentencia (executemany)
+# y un solo commit. Las filas ya vienen validadas por los schemas.
+
+
+def _last_per_key(rows: List[dict], *keys):
+    # Postgres no deja que un mismo INSERT ... ON CONFLICT toque dos veces la misma fila
+    return list({tuple(r[k] for k in keys): r for r in rows}.values())
+
+
+def bulk_upsert_champions(db: Session, rows: List[dict]):
+    table = models.Champion.__table__
+    stmt = _upsert(db, models.Champion)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.nombre],
+        set_={k: stmt.excluded[k] for k in ("rol", "tasa_victoria", "tasa_seleccion", "tasa_baneo", "activo")}
+    ).returning(table.c.id, table.c.nombre, table.c.rol, table.c.activo,
+                table.c.tasa_victoria, table.c.tasa_seleccion, table.c.tasa_baneo)
+
+    rows = _last_per_key(rows, "nombre")
+    roles = dict(db.execute(
+        select(models.Champion.nombre, models.Champion.rol).where(models.Champion.nombre.in_([r["nombre"] for r in rows]))
+    ).all())
+
+    written = db.execute(stmt, rows).all()
+    history.record_champions(db, written)
+
+    # Igual que update_champion: si cambia el rol, cambian los counters por rol de sus rivales
+    cambiados = [c.id for c in written if c.nombre in roles and roles[c.nombre] != c.rol]
+    if cambiados:
+        rivales = db.query(models.ChampionVsChampion.champion_id).filter(
+            models.ChampionVsChampion.oponente_id.in_(cambiados)
+        )
+        counters.rebuild(db, {r.champion_id for r in rivales})
+
+    db.commit()
+    _champions_changed(*written)
+    return len(written)
+
+
+def bulk_upsert_items(db: Session, rows: List[dict]):
+    table = models.Item.__table__
+    stmt = _upsert(db, models.Item)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.nombre],
+        set_={k: stmt.excluded[k] for k in ("tipo", "porcentaje_uso")}
+    ).returning(table.c.id, table.c.nombre, table.c.activo)
+
+    written = db.execute(stmt, _last_per_key(rows, "nombre")).all()
+    db.commit()
+    _items_changed(*written)
+    return len(written)
+
+
+def bulk_upsert_champion_items(db: Session, rows: List[dict]):
+    table = models.ChampionItem.__table__
+    stmt = _upsert(db, models.ChampionItem)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.champion_id, table.c.item_id],
+        set_={"porcentaje_uso": stmt.excluded.porcentaje_uso}
+    )
+
+    rows = _last_per_key(rows, "champion_id", "item_id")
+    db.execute(stmt, rows)
+    history.record_builds(db, [(r["champion_id"], r["item_id"], r["porcentaje_uso"]) for r in rows])
+    db.commit()
+    versions.bump("builds", *{r["champion_id"] for r in rows})
+    leaderboard.mark_dirty()
+    recommend.index.refresh(db, {r["champion_id"] for r in rows})
+    return len(rows)
+
+
+def bulk_upsert_cvc(db: Session, rows: List[dict]):
+    # upsert_cvc_many cuenta cada par en los dos sentidos
+    return upsert_cvc_many(db, [(r["champion_id"], r["oponente_id"], r["winrate"]) for r in rows]) // 2
+
+
+
+# PARTIDAS (ver matches.py)
+#
+# matches.py calcula las tasas a partir de las partidas; aquí solo se
+# escriben, todo en la misma transacción y con un solo commit.
+
+
+def add_matches_played(db: Session, partidas: int) -> int:
+    """Suma partidas al total y devuelve el total nuevo. No hace commit.
+
+    Es lo primero que hace una ingesta: el UPDATE bloquea la fila hasta el
+    commit, así dos ingestas a la vez no leen los mismos contadores.
+    """
+    totals = models.MatchTotals
+    total = db.execute(
+        update(totals).where(totals.id == 1).values(partidas=totals.partidas + partidas).returning(totals.partidas)
+    ).scalar()
+    if total is None:
+        db.execute(insert(totals).values(id=1, partidas=partidas))
+        total = partidas
+    return total
+
+
+def get_matches_played(db: Session) -> int:
+    return db.scalar(select(models.MatchTotals.partidas).where(models.MatchTotals.id == 1)) or 0
+
+
+def write_match_stats(db: Session, champions: List[dict], builds: List[dict], matchups):
+    """Escribe lo calculado por matches.aggregate y hace commit.
+
+    champions: id, tasas, muestras y baneos; builds: champion_id, item_id,
+    porcentaje_uso y muestras; matchups: (champion_id, oponente_id, winrate, muestras).
+    """
+    if champions:
+        # UPDATE ... WHERE id = ? en executemany (bulk update por primary key)
+        db.execute(update(models.Champion), champions)
+
+    if builds:
+        table = models.ChampionItem.__table__
+        stmt = _upsert(db, models.ChampionItem)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.champion_id, table.c.item_id],
+            set_={"porcentaje_uso": stmt.excluded.porcentaje_uso, "muestras": stmt.excluded.muestras}
+        )
+        db.execute(stmt, builds)
+        history.record_builds(db, [(r["champion_id"], r["item_id"], r["porcentaje_uso"]) for r in builds])
+
+    cvc_rows = _upsert_cvc_rows(db, matchups)
+
+    written = db.query(
+        Champion.id, Champion.nombre, Champion.rol, Champion.activo,
+        Champion.tasa_victoria, Champion.tasa_seleccion, Champion.tasa_baneo
+    ).filter(Champion.id.in_([c["id"] for c in champions])).all()
+    history.record_champions(db, written)
+    db.commit()
+
+    _champions_changed(*written)
+    if builds:
+        versions.bump("builds", *{r["champion_id"] for r in builds})
+        recommend.index.refresh(db, {r["champion_id"] for r in builds})
+    if cvc_rows:
+        _cvc_changed(cvc_rows)
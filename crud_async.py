@@ -0,0 +1,81 @@
+"""Versiones async de las lecturas más usadas de crud.py (solo con DB_ASYNC=1).
+
+Comparten la caché del catálogo con crud: mismas claves y mismas copias
+planas, que se enlazan a la sesión con sync_session.merge(load=False) (no
+emite SQL, así que se puede llamar sin await).
+"""
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models, pagination, leaderboard
+from cache import catalog_cache
+from crud import _rehydrate, _snapshot
+
+
+async def _cached_one(db: AsyncSession, model, key, stmt):
+    row = catalog_cache.get(key)
+    if row is None:
+        obj = (await db.execute(stmt)).scalars().first()
+        if obj is not None:
+            catalog_cache.set(key, _snapshot(obj))
+        return obj
+    return _rehydrate(db.sync_session, model, row)
+
+
+async def _cached_list(db: AsyncSession, model, key, stmt):
+    rows = catalog_cache.get(key)
+    if rows is None:
+        objs = (await db.execute(stmt)).scalars().all()
+        catalog_cache.set(key, [_snapshot(o) for o in objs])
+        return objs
+    return [_rehydrate(db.sync_session, model, row) for row in rows]
+
+
+async def get_champion(db: AsyncSession, champion_id: int):
+    stmt = select(models.Champion).where(models.Champion.id == champion_id)
+    return await _cached_one(db, models.Champion, ("champions", "get", champion_id), stmt)
+
+
+async def get_champion_by_name(db: AsyncSession, nombre: str):
+    stmt = select(models.Champion).where(models.Champion.nombre == nombre)
+    return (await db.execute(stmt)).scalars().first()
+
+
+async def list_champions(db: AsyncSession, skip: int = 0, limit: int = 100, include_inactive: bool = False, rol: str = None,
+                         after: Optional[tuple] = None):
+    stmt = select(models.Champion)
+
+    if not include_inactive:
+        stmt = stmt.where(models.Champion.activo == True)
+
+    if rol:
+        stmt = stmt.where(models.Champion.rol == rol)
+
+    stmt = pagination.after(stmt, [models.Champion.id], after)
+    if after is None and skip:
+        stmt = stmt.offset(skip)
+
+    key = ("champions", "list", skip, limit, include_inactive, rol, after)
+    return await _cached_list(db, models.Champion, key, stmt.order_by(models.Champion.id).limit(limit))
+
+
+async def list_leaderboard(db: AsyncSession, rol: Optional[str] = None, limit: int = 100,
+                           after: Optional[tuple] = None):
+    return (await db.execute(leaderboard.page_query(rol, limit, after))).scalars().all()
+
+
+async def list_items(db: AsyncSession, skip: int = 0, limit: int = 100, include_inactive: bool = False,
+                     after: Optional[tuple] = None):
+    stmt = select(models.Item)
+
+    if not include_inactive:
+        stmt = stmt.where(models.Item.activo == True)
+
+    stmt = pagination.after(stmt, [models.Item.id], after)
+    if after is None and skip:
+        stmt = stmt.offset(skip)
+
+    key = ("items", "list", skip, limit, include_inactive, after)
+    return await _cached_list(db, models.Item, key, stmt.order_by(models.Item.id).limit(limit))
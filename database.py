@@ -1,6 +1,12 @@
 import os
+import threading
+import time
+
+import anyio
+from anyio import to_thread
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 
 DATABASE_URL = os.getenv(
     "POSTGRESQL_ADDON_URI",
@@ -16,20 +22,186 @@ db = os.getenv("POSTGRESQL_ADDON_DB")
 if host and port and user and password and db:
     DATABASE_URL = f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db}?sslmode=require"
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+# DB_ASYNC=1 activa la ruta asíncrona (asyncpg / aiosqlite) en las rutas de lectura
+DB_ASYNC = os.getenv("DB_ASYNC", "0").lower() in ("1", "true", "yes")
+
+# Pool de conexiones: dimensionarlo según los workers de uvicorn y el límite del add-on
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+
+# ============================================================
+# Métricas del pool
+# ============================================================
+
+class PoolMetrics:
+    """Cuánto se espera por una conexión del pool (incluye abrir una nueva)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+class _MeteredPool:
+    """Mide la espera de cada checkout; se combina con la clase de pool real."""
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except Exception:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return conn
+
+
+class MeteredQueuePool(_MeteredPool, QueuePool):
+    metrics = PoolMetrics()
+
+
+class MeteredAsyncPool(_MeteredPool, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics()
+
+
+def pool_options(url: str) -> dict:
+    options = {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+    }
+
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False} if "aiosqlite" not in url else {}
+    elif STATEMENT_TIMEOUT_MS:
+        if "asyncpg" in url:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+engine = create_engine(DATABASE_URL, poolclass=MeteredQueuePool, **pool_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+def async_url(url: str) -> str:
+    """Traduce la URL síncrona al driver async equivalente."""
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite" + url[url.index(":"):]
+
+    scheme, rest = url.split("://", 1)
+    if scheme in ("postgres", "postgresql") or scheme.startswith("postgresql+"):
+        # asyncpg no entiende sslmode=..., usa ssl=...
+        return "postgresql+asyncpg://" + rest.replace("sslmode=", "ssl=")
+    return url
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    ASYNC_DATABASE_URL = async_url(DATABASE_URL)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, poolclass=MeteredAsyncPool, **pool_options(ASYNC_DATABASE_URL)
+    )
+    # expire_on_commit=False: en async no se puede recargar un atributo de forma implícita
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def pool_status():
+    def status(eng, metrics):
+        pool = eng.pool
+        return {
+            "size": pool.size(),
+            "max_overflow": MAX_OVERFLOW,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            **metrics.snapshot(),
+        }
+
+    data = {"sync": status(engine, MeteredQueuePool.metrics)}
+    data["sync"]["sessions"] = {
+        "slots": POOL_SIZE + MAX_OVERFLOW,
+        "waiting": session_slots.statistics().tasks_waiting,
+        **slot_metrics.snapshot(),
+    }
+    if async_engine is not None:
+        data["async"] = status(async_engine.sync_engine, MeteredAsyncPool.metrics)
+    return data
+
+
 def init_db():
-    import models
-    Base.metadata.create_all(bind=engine)
+    """Lleva el esquema a la última migración (migrations/versions).
+
+    Con varios workers de uvicorn conviene correr `alembic upgrade head` una
+    vez antes de arrancarlos, para que no migren todos a la vez.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    config = Config(os.path.join(root, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(root, "migrations"))
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
+# Una sesión por petición, como mucho tantas a la vez como conexiones tiene el pool.
+#
+# Los handlers sync corren en el threadpool de anyio y la sesión conserva su
+# conexión hasta el cierre, que llega después de serializar la respuesta (otro
+# hilo más). Si los hilos se quedan esperando conexión en el pool, nadie
+# serializa ni cierra y todo se bloquea hasta el pool_timeout. Por eso la
+# espera se hace aquí, en el event loop, antes de ocupar ningún hilo.
+session_slots = anyio.Semaphore(POOL_SIZE + MAX_OVERFLOW)
+slot_metrics = PoolMetrics()
+
+
+async def get_db():
+    started = time.perf_counter()
+    async with session_slots:
+        slot_metrics.record(time.perf_counter() - started)
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await to_thread.run_sync(db.close)
+
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
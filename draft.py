@@ -0,0 +1,162 @@
+import threading
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+import models
+
+
+class MatchupMatrix:
+    """Matriz densa campeón x campeón con los winrates de champion_vs_champion.
+
+    winrate[i, j] es el winrate del campeón i contra el j; known[i, j] indica
+    si ese par está registrado. Se carga una vez al arrancar y crud la
+    mantiene al día en cada escritura, así evaluar un draft es una operación
+    vectorizada sobre la matriz y no una query por par.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(0)
+
+    def _reset(self, size):
+        self.index = {}                                 # champion_id -> fila/columna
+        self.ids = np.zeros(size, dtype=np.int64)
+        self.nombres = [""] * size
+        self.roles = np.empty(size, dtype=object)
+        self.activos = np.zeros(size, dtype=bool)
+        self.winrate = np.full((size, size), 50.0, dtype=np.float32)
+        self.known = np.zeros((size, size), dtype=bool)
+        self.size = 0
+
+    def load(self, db: Session):
+        champions = db.query(
+            models.Champion.id, models.Champion.nombre, models.Champion.rol, models.Champion.activo
+        ).all()
+        pairs = db.query(
+            models.ChampionVsChampion.champion_id,
+            models.ChampionVsChampion.oponente_id,
+            models.ChampionVsChampion.winrate
+        ).all()
+
+        with self._lock:
+            self._reset(len(champions))
+            for champion in champions:
+                self._set_champion(*champion)
+            self._set_pairs(pairs)
+
+    # ---------------- escrituras (llamadas desde crud) ----------------
+
+    def set_champion(self, champion_id, nombre, rol, activo):
+        with self._lock:
+            self._set_champion(champion_id, nombre, rol, activo)
+
+    def set_pairs(self, pairs):
+        """pairs: iterable de (champion_id, oponente_id, winrate)."""
+        with self._lock:
+            self._set_pairs(pairs)
+
+    def clear_pairs(self, pairs):
+        with self._lock:
+            for champion_id, oponente_id in pairs:
+                if champion_id in self.index and oponente_id in self.index:
+                    self.known[self.index[champion_id], self.index[oponente_id]] = False
+
+    def _set_champion(self, champion_id, nombre, rol, activo):
+        i = self.index.get(champion_id)
+        if i is None:
+            i = self._append(champion_id)
+        self.nombres[i] = nombre
+        self.roles[i] = rol
+        self.activos[i] = bool(activo)
+
+    def _set_pairs(self, pairs):
+        pairs = list(pairs)
+        if not pairs:
+            return
+        for champion_id, oponente_id, _ in pairs:
+            for cid in (champion_id, oponente_id):
+                if cid not in self.index:
+                    self._append(cid)
+
+        rows = np.fromiter((self.index[p[0]] for p in pairs), dtype=np.int64, count=len(pairs))
+        cols = np.fromiter((self.index[p[1]] for p in pairs), dtype=np.int64, count=len(pairs))
+        self.winrate[rows, cols] = [p[2] for p in pairs]
+        self.known[rows, cols] = True
+
+    def _append(self, champion_id):
+        # Crece duplicando la capacidad para que añadir campeones sea O(1) amortizado
+        capacity = len(self.ids)
+        if self.size == capacity:
+            new_capacity = max(8, capacity * 2)
+            grow = new_capacity - capacity
+            self.ids = np.concatenate([self.ids, np.zeros(grow, dtype=np.int64)])
+            self.nombres.extend([""] * grow)
+            self.roles = np.concatenate([self.roles, np.empty(grow, dtype=object)])
+            self.activos = np.concatenate([self.activos, np.zeros(grow, dtype=bool)])
+            self.winrate = np.pad(self.winrate, ((0, grow), (0, grow)), constant_values=50.0)
+            self.known = np.pad(self.known, ((0, grow), (0, grow)), constant_values=False)
+
+        i = self.size
+        self.index[champion_id] = i
+        self.ids[i] = champion_id
+        self.size += 1
+        return i
+
+    # ---------------- lecturas ----------------
+
+    def _indices(self, champion_ids):
+        return np.array([self.index[c] for c in champion_ids if c in self.index], dtype=np.int64)
+
+    def score_draft(self, azul, rojo):
+        """Winrate esperado del equipo azul contra el rojo (media de los pares conocidos)."""
+        with self._lock:
+            a, r = self._indices(azul), self._indices(rojo)
+            sub = self.winrate[np.ix_(a, r)]
+            mask = self.known[np.ix_(a, r)]
+
+        conocidos = int(mask.sum())
+        azul_wr = float(sub[mask].mean()) if conocidos else 50.0
+        return {
+            "azul": round(azul_wr, 2),
+            "rojo": round(100.0 - azul_wr, 2),
+            "pares_conocidos": conocidos,
+            "pares_totales": int(mask.size),
+        }
+
+    def rank_picks(self, enemigos, rol=None, limit=10):
+        """Ordena todos los campeones activos por winrate medio contra los enemigos."""
+        with self._lock:
+            n = self.size
+            e = self._indices(enemigos)
+            mask = self.known[:n][:, e]
+            sums = np.where(mask, self.winrate[:n][:, e], 0.0).sum(axis=1)
+            counts = mask.sum(axis=1)
+
+            candidatos = self.activos[:n] & (counts > 0)
+            candidatos[e] = False
+            if rol:
+                candidatos &= self.roles[:n] == rol
+
+            idx = np.flatnonzero(candidatos)
+            scores = sums[idx] / counts[idx]
+            # argpartition + sort solo del top: O(n) en vez de ordenar todo
+            if len(idx) > limit:
+                top = np.argpartition(-scores, limit)[:limit]
+            else:
+                top = np.arange(len(idx))
+            top = top[np.argsort(-scores[top], kind="stable")]
+
+            return [
+                {
+                    "champion_id": int(self.ids[idx[t]]),
+                    "nombre": self.nombres[idx[t]],
+                    "rol": self.roles[idx[t]],
+                    "winrate": round(float(scores[t]), 2),
+                    "pares_conocidos": int(counts[idx[t]]),
+                }
+                for t in top
+            ]
+
+
+matrix = MatchupMatrix()
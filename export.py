@@ -0,0 +1,147 @@
+"""Exportación completa de campeones, ítems, builds y matchups.
+
+Lo contrario de bulk.py: GET /export/{entity}?formato=csv|jsonl|parquet
+(ver routers/export.py) o desde la terminal:
+
+    python export.py matchups matchups.parquet
+
+Las filas se leen por lotes con yield_per (cursor del lado del servidor en
+Postgres) y cada lote se serializa y se entrega antes de pedir el siguiente,
+así la memoria no depende del tamaño de la tabla. Parquet necesita pyarrow,
+que es opcional.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+
+from sqlalchemy import Boolean, Float, Integer, select
+
+import models
+from database import SessionLocal
+
+# Mismos nombres que en bulk.ENTITIES: lo exportado se puede volver a importar
+ENTITIES = {
+    "champions": models.Champion,
+    "items": models.Item,
+    "builds": models.ChampionItem,
+    "matchups": models.ChampionVsChampion,
+}
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+
+def _batches(entity: str, batch_size: int):
+    """Genera listas de filas (dict). Abre su propia sesión: vive lo que dure la descarga."""
+    table = ENTITIES[entity].__table__
+    stmt = select(table).order_by(table.c.id).execution_options(yield_per=batch_size)
+
+    with SessionLocal() as db:
+        for partition in db.execute(stmt).mappings().partitions():
+            yield [dict(row) for row in partition]
+
+
+def columns(entity: str):
+    return [c.name for c in ENTITIES[entity].__table__.columns]
+
+
+def to_csv(entity: str, batch_size: int = BATCH_SIZE):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns(entity))
+    writer.writeheader()
+
+    for batch in _batches(entity, batch_size):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def to_jsonl(entity: str, batch_size: int = BATCH_SIZE):
+    for batch in _batches(entity, batch_size):
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in batch).encode("utf-8")
+
+
+class _Drain(io.RawIOBase):
+    """Archivo de solo escritura que se vacía cada vez que se leen sus bytes."""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def to_parquet(entity: str, batch_size: int = BATCH_SIZE):
+    """Un row group por lote; los bytes de cada uno salen en cuanto se escribe."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {Integer: pa.int64(), Float: pa.float64(), Boolean: pa.bool_()}
+    schema = pa.schema([
+        (c.name, next((t for base, t in types.items() if isinstance(c.type, base)), pa.string()))
+        for c in ENTITIES[entity].__table__.columns
+    ])
+
+    sink = _Drain()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in _batches(entity, batch_size):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.take()
+    yield sink.take()
+
+
+WRITERS = {"csv": to_csv, "jsonl": to_jsonl, "parquet": to_parquet}
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportación completa de DrPoro")
+    parser.add_argument("entity", choices=sorted(ENTITIES))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=sorted(WRITERS))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or os.path.splitext(args.path)[1].lstrip(".").lower()
+    if fmt not in WRITERS:
+        parser.error(f"formato desconocido: {fmt}")
+
+    with open(args.path, "wb") as out:
+        for chunk in WRITERS[fmt](args.entity, args.batch_size):
+            out.write(chunk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Histórico de estadísticas por parche.
+
+champions, champion_items y champion_vs_champion solo guardan el valor
+actual; cada escritura de crud deja además una foto en las tablas *_history
+con el parche en curso. De un parche a otro se añaden filas (nunca se
+reescriben las de parches anteriores); dentro del mismo parche la foto es
+la del último valor escrito.
+
+El parche en curso es el último de la tabla patches. Al arrancar,
+ensure_patch(PARCHE_ACTUAL) añade uno nuevo si la variable cambió desde el
+último despliegue, y al abrirlo copia las tasas actuales de todos los
+campeones: así la serie de un campeón que no se escribe en todo el parche
+no se corta ni calcula el delta saltándose parches.
+
+Para las gráficas, cada campeón tiene en champion_trends su serie completa
+ya calculada (valores, delta contra el parche anterior y media móvil de
+TREND_WINDOW parches) empaquetada como un array de float64: leer la
+tendencia es leer una fila, sin recorrer el histórico. Se recalcula, solo
+para los campeones tocados, dentro de la misma transacción que la escritura
+(igual que counters.rebuild).
+"""
+import math
+import os
+import struct
+
+from sqlalchemy import func, insert, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+import models
+
+PARCHE_ACTUAL = os.getenv("PARCHE_ACTUAL", "inicial")
+WINDOW = int(os.getenv("TREND_WINDOW", "3"))
+
+STATS = ("tasa_victoria", "tasa_seleccion", "tasa_baneo")
+# Orden de las series dentro del blob: cada una ocupa len(parches) valores
+SERIES = STATS + tuple(f"delta_{s}" for s in STATS) + tuple(f"media_{s}" for s in STATS)
+
+
+# ============================================================
+# PARCHES
+# ============================================================
+
+def current_patch(db: Session) -> int:
+    patch_id = db.scalar(select(func.max(models.Patch.id)))
+    if patch_id is None:
+        patch_id = ensure_patch(db, PARCHE_ACTUAL)
+    return patch_id
+
+
+def ensure_patch(db: Session, nombre: str) -> int:
+    """Devuelve el id del parche en curso, creándolo si no es nombre. No hace commit."""
+    ultimo = db.query(models.Patch).order_by(models.Patch.id.desc()).first()
+    if ultimo is not None and ultimo.nombre == nombre:
+        return ultimo.id
+
+    patch = models.Patch(nombre=nombre)
+    db.add(patch)
+    db.flush()
+
+    # Foto inicial del parche nuevo con los valores actuales (un solo INSERT ... SELECT)
+    champion = models.Champion
+    db.execute(
+        insert(models.ChampionStatHistory).from_select(
+            ["champion_id", "parche_id", *STATS],
+            select(champion.id, literal(patch.id), *(getattr(champion, s) for s in STATS))
+        )
+    )
+    rebuild_all(db)
+    return patch.id
+
+
+# ============================================================
+# ESCRITURA (sin commit: dentro de la transacción de crud)
+# ============================================================
+
+CHUNK = 500
+
+
+def _replace(db: Session, model, keys, rows):
+    """Borra y vuelve a insertar las fotos del parche en curso de las claves de rows."""
+    if not rows:
+        return
+    patch_id = current_patch(db)
+    for row in rows:
+        row["parche_id"] = patch_id
+
+    cols = [getattr(model, k) for k in keys]
+    claves = list({tuple(r[k] for k in keys) for r in rows})
+    # Por tandas: una carga masiva de matchups no cabe en un solo IN
+    for i in range(0, len(claves), CHUNK):
+        tanda = claves[i:i + CHUNK]
+        db.query(model).filter(
+            model.parche_id == patch_id,
+            tuple_(*cols).in_(tanda) if len(cols) > 1 else cols[0].in_([c for c, in tanda])
+        ).delete(synchronize_session=False)
+    db.execute(insert(model), rows)
+
+
+def record_champions(db: Session, champions):
+    """champions: objetos o filas con id y las tres tasas."""
+    db.flush()
+    rows = [{"champion_id": c.id, **{s: getattr(c, s) for s in STATS}} for c in champions]
+    _replace(db, models.ChampionStatHistory, ["champion_id"], rows)
+    rebuild_trends(db, [r["champion_id"] for r in rows])
+
+
+def record_builds(db: Session, builds):
+    """builds: (champion_id, item_id, porcentaje_uso)."""
+    rows = [{"champion_id": c, "item_id": i, "porcentaje_uso": p} for c, i, p in builds]
+    _replace(db, models.ChampionItemHistory, ["champion_id", "item_id"], rows)
+
+
+def record_matchups(db: Session, matchups):
+    """matchups: (champion_id, oponente_id, winrate)."""
+    rows = [{"champion_id": c, "oponente_id": o, "winrate": w} for c, o, w in matchups]
+    _replace(db, models.MatchupHistory, ["champion_id", "oponente_id"], rows)
+
+
+# ============================================================
+# TENDENCIAS
+# ============================================================
+
+def _pack(values) -> bytes:
+    return struct.pack(f"<{len(values)}d", *values)
+
+
+def _unpack(blob: bytes):
+    return struct.unpack(f"<{len(blob) // 8}d", blob)
+
+
+def _series(values):
+    """(delta contra el parche anterior, media móvil de WINDOW parches)."""
+    deltas, medias = [], []
+    for i, v in enumerate(values):
+        deltas.append(v - values[i - 1] if i else math.nan)
+        ventana = values[max(0, i - WINDOW + 1):i + 1]
+        medias.append(sum(ventana) / len(ventana))
+    return deltas, medias
+
+
+def rebuild_trends(db: Session, champion_ids):
+    champion_ids = set(champion_ids)
+    if not champion_ids:
+        return
+
+    h = models.ChampionStatHistory
+    rows = db.execute(
+        select(h.champion_id, models.Patch.nombre, *(getattr(h, s) for s in STATS))
+        .join(models.Patch, models.Patch.id == h.parche_id)
+        .where(h.champion_id.in_(champion_ids))
+        .order_by(h.champion_id, h.parche_id)
+    ).all()
+
+    historias = {}
+    for champion_id, parche, *stats in rows:
+        historias.setdefault(champion_id, []).append((parche, [v if v is not None else 0.0 for v in stats]))
+
+    nuevas = []
+    for champion_id, historia in historias.items():
+        parches = [p for p, _ in historia]
+        columnas = [[stats[i] for _, stats in historia] for i in range(len(STATS))]
+        rollups = [_series(col) for col in columnas]
+        valores = (
+            [v for col in columnas for v in col]
+            + [v for deltas, _ in rollups for v in deltas]
+            + [v for _, medias in rollups for v in medias]
+        )
+        nuevas.append({"champion_id": champion_id, "parches": parches, "series": _pack(valores)})
+
+    db.query(models.ChampionTrend).filter(
+        models.ChampionTrend.champion_id.in_(champion_ids)
+    ).delete(synchronize_session=False)
+    if nuevas:
+        db.execute(insert(models.ChampionTrend), nuevas)
+
+
+def rebuild_all(db: Session):
+    rebuild_trends(db, [c for c, in db.query(models.ChampionStatHistory.champion_id).distinct()])
+
+
+def ensure_built(db: Session):
+    """Arranque: abre el parche de PARCHE_ACTUAL y, la primera vez, guarda los valores actuales."""
+    vacio = db.query(models.ChampionStatHistory.id).first() is None
+    ensure_patch(db, PARCHE_ACTUAL)
+    if vacio:
+        record_champions(db, db.query(models.Champion).all())
+        record_builds(db, db.query(
+            models.ChampionItem.champion_id, models.ChampionItem.item_id, models.ChampionItem.porcentaje_uso
+        ).all())
+        record_matchups(db, db.query(
+            models.ChampionVsChampion.champion_id, models.ChampionVsChampion.oponente_id,
+            models.ChampionVsChampion.winrate
+        ).all())
+    db.commit()
+
+
+def get_trend(db: Session, champion_id: int, last: int = None):
+    """Series de un campeón ({"parches": [...], "tasa_victoria": [...], ...}) o None."""
+    trend = db.get(models.ChampionTrend, champion_id)
+    if trend is None:
+        return None
+
+    n = len(trend.parches)
+    valores = _unpack(trend.series)
+    inicio = n - last if last and last < n else 0
+
+    data = {"parches": trend.parches[inicio:]}
+    for i, nombre in enumerate(SERIES):
+        data[nombre] = [None if math.isnan(v) else v for v in valores[i * n + inicio:(i + 1) * n]]
+    return data
@@ -0,0 +1,261 @@
+"""Caché HTTP: ETag / Last-Modified y GET condicionales.
+
+Cada colección ("champions", "items", "builds", "cvc") y cada campeón / ítem
+tiene un número de versión que crud sube en cada escritura. El ETag de una
+respuesta sale de las versiones de lo que muestra + la URL, así que se
+calcula sin consultar las tablas y, si coincide con If-None-Match, se
+responde 304 antes de abrir la consulta.
+
+Las versiones se guardan en la tabla cache_versions para que todos los
+procesos (workers de uvicorn, bulk.py, matches.py) vean las mismas. Cada
+proceso guarda una copia y la pone al día como mucho cada
+VERSIONS_SYNC_SECONDS, leyendo solo las filas nuevas. Además el ETag lleva
+una franja de HTTP_CACHE_ETAG_TTL segundos: una escritura que no pasa por
+crud (SQL a mano) deja de servirse como mucho al cambiar de franja.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from email.utils import formatdate
+
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+import database, models
+from cache import catalog_cache, page_cache
+
+# s-maxage: cuánto puede servir el CDN sin revalidar; el navegador revalida siempre
+CACHE_S_MAXAGE = int(os.getenv("HTTP_CACHE_S_MAXAGE", "30"))
+CACHE_CONTROL = f"public, max-age=0, must-revalidate, s-maxage={CACHE_S_MAXAGE}"
+
+SYNC_SECONDS = float(os.getenv("VERSIONS_SYNC_SECONDS", "1"))
+ETAG_TTL = int(os.getenv("HTTP_CACHE_ETAG_TTL", "300"))
+
+logger = logging.getLogger(__name__)
+
+
+def _insert(conn):
+    dialect = postgresql if conn.dialect.name == "postgresql" else sqlite
+    return dialect.insert(models.CacheVersion)
+
+
+class Versions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._started = time.time()
+        self._versions = {}     # namespace o (namespace, id) -> (versión, timestamp)
+        self._seen = 0          # mayor versión leída de la tabla
+        self._synced = float("-inf")
+        self._mine = set()      # versiones escritas por este proceso
+        self._external = set()  # namespaces que cambió otro proceso desde pop_external()
+
+    def bump(self, namespace: str, *ids):
+        """Llamado desde crud después de cada commit que cambia namespace."""
+        keys = (namespace, *((namespace, i) for i in ids))
+        now = time.time()
+        try:
+            version = self._write(namespace, ids, now)
+        except Exception:
+            # Sin la tabla (base caída, sin migrar) al menos este proceso se entera
+            logger.exception("No se pudo guardar la versión de %s", namespace)
+            with self._lock:
+                for key in keys:
+                    self._versions[key] = (self._versions.get(key, (0, now))[0] + 1, now)
+            return
+
+        with self._lock:
+            self._mine.add(version)
+            for key in keys:
+                self._versions[key] = (version, now)
+
+    def _write(self, namespace, ids, now) -> int:
+        cv = models.CacheVersion
+        with database.engine.begin() as conn:
+            # Contador global. El UPDATE bloquea la fila hasta el commit (una
+            # transacción corta, fuera de la de crud), así las versiones se
+            # confirman en orden y sync() puede pedir solo version > _seen
+            version = conn.execute(
+                update(cv).where(cv.namespace == "", cv.entity_id == 0)
+                .values(version=cv.version + 1, modificado=now).returning(cv.version)
+            ).scalar()
+            if version is None:
+                version = 1
+                conn.execute(_insert(conn).values(namespace="", entity_id=0, version=version, modificado=now))
+
+            stmt = _insert(conn)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[cv.namespace, cv.entity_id],
+                set_={"version": stmt.excluded.version, "modificado": stmt.excluded.modificado}
+            )
+            conn.execute(stmt, [
+                {"namespace": namespace, "entity_id": i, "version": version, "modificado": now}
+                for i in (0, *ids)
+            ])
+        return version
+
+    def due(self) -> bool:
+        return time.monotonic() - self._synced >= SYNC_SECONDS
+
+    def sync(self):
+        """Trae de cache_versions lo que cambió desde la última lectura."""
+        if not self._sync_lock.acquire(blocking=False):
+            return      # ya lo está haciendo otro hilo
+        try:
+            cv = models.CacheVersion
+            with database.engine.connect() as conn:
+                rows = conn.execute(
+                    select(cv.namespace, cv.entity_id, cv.version, cv.modificado).where(cv.version > self._seen)
+                ).all()
+        except Exception:
+            logger.exception("No se pudieron leer las versiones de caché")
+            rows = []
+        finally:
+            self._synced = time.monotonic()
+            self._sync_lock.release()
+
+        external = set()
+        with self._lock:
+            for namespace, entity_id, version, modificado in rows:
+                self._seen = max(self._seen, version)
+                if not namespace:
+                    continue
+                key = (namespace, entity_id) if entity_id else namespace
+                if version > self._versions.get(key, (0, 0))[0]:
+                    self._versions[key] = (version, modificado)
+                if version not in self._mine:
+                    external.add(namespace)
+            self._external |= external
+            self._mine = {v for v in self._mine if v > self._seen}
+
+        # El ETag nuevo ya se ve en este proceso: la copia de catalog_cache no
+        # puede seguir sirviendo lo de antes bajo esa versión
+        for namespace in external:
+            catalog_cache.invalidate(namespace)
+
+    async def sync_async(self):
+        # Desde el event loop la lectura va al threadpool
+        if self.due():
+            await run_in_threadpool(self.sync)
+
+    def pop_external(self) -> set:
+        """Namespaces escritos por otros procesos desde la última llamada (ver indexes.py)."""
+        with self._lock:
+            external, self._external = self._external, set()
+        return external
+
+    def get(self, key):
+        with self._lock:
+            return self._versions.get(key, (0, self._started))
+
+    def token(self, keys) -> tuple:
+        """(parte del ETag, última modificación) de un conjunto de claves."""
+        if self.due():
+            self.sync()
+        entries = [self.get(k) for k in keys]
+        franja = int(time.time() // ETAG_TTL) if ETAG_TTL > 0 else 0
+        token = ".".join(str(v) for v, _ in entries) + f".{franja}"
+        return token, max(ts for _, ts in entries)
+
+
+versions = Versions()
+
+
+def _matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Comparación débil (RFC 9110): W/"x" y "x" son el mismo
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in header.split(","))
+
+
+class Conditional:
+    """Dependencia para los GET cacheables.
+
+        @router.get("/list", dependencies=[Depends(Conditional("champions"))])
+
+    entity="champions" versiona por el path param champion_id / item_id en
+    vez de por la colección entera. Si el cliente ya tiene la versión actual
+    se corta con 304; si no, deja el ETag en request.state y el middleware
+    de main.py lo pone en la respuesta 200.
+    """
+
+    def __init__(self, *namespaces: str, entity: str = None, param: str = None):
+        self.namespaces = namespaces
+        self.entity = entity
+        self.param = param
+
+    async def __call__(self, request: Request):
+        # async: solo toca la base al poner al día las versiones, y eso en el threadpool
+        await versions.sync_async()
+        keys = list(self.namespaces)
+        if self.entity:
+            try:
+                keys.append((self.entity, int(request.path_params[self.param])))
+            except ValueError:
+                return      # id no numérico: que responda la validación de la ruta
+
+        token, modified = versions.token(keys)
+        url = request.url.path + "?" + request.url.query
+        etag = 'W/"' + hashlib.blake2b(f"{token}|{url}".encode(), digest_size=12).hexdigest() + '"'
+        last_modified = formatdate(int(modified), usegmt=True)
+
+        headers = {"ETag": etag, "Last-Modified": last_modified, "Cache-Control": CACHE_CONTROL}
+
+        # Solo If-None-Match: If-Modified-Since tiene resolución de un segundo y
+        # daría por buena una respuesta escrita dos veces en el mismo segundo
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and _matches(if_none_match, etag):
+            raise HTTPException(304, headers=headers)
+        request.state.cache_headers = headers
+
+
+async def add_cache_headers(request: Request, call_next):
+    """Middleware HTTP: copia las cabeceras de Conditional a las respuestas 200."""
+    response = await call_next(request)
+    headers = getattr(request.state, "cache_headers", None)
+    if headers and response.status_code == 200:
+        response.headers.update(headers)
+    return response
+
+
+# ============================================================
+# HTML renderizado
+# ============================================================
+
+def _page_key(request: Request, namespaces) -> tuple:
+    # La versión va en la clave: tras una escritura la copia vieja ya no se
+    # encuentra y acaba saliendo por LRU, no hace falta borrarla a mano
+    token, _ = versions.token(namespaces)
+    return (str(request.base_url), request.url.path, request.url.query, token)
+
+
+def cached_page(request: Request, namespaces, render) -> HTMLResponse:
+    """Devuelve el HTML guardado o llama a render() (que consulta y renderiza) y lo guarda."""
+    key = _page_key(request, namespaces)
+    body = page_cache.get(key)
+    if body is not None:
+        return HTMLResponse(body)
+
+    response = render()
+    if response.status_code == 200:
+        page_cache.set(key, response.body)
+    return response
+
+
+async def cached_page_async(request: Request, namespaces, render) -> HTMLResponse:
+    """Igual que cached_page, con render async (rutas con DB_ASYNC=1)."""
+    await versions.sync_async()
+    key = _page_key(request, namespaces)
+    body = page_cache.get(key)
+    if body is not None:
+        return HTMLResponse(body)
+
+    response = await render()
+    if response.status_code == 200:
+        page_cache.set(key, response.body)
+    return response
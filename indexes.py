@@ -0,0 +1,76 @@
+"""Índices en memoria de cada proceso y su recarga.
+
+La búsqueda (search.py), la matriz de matchups (draft.py) y las builds
+recomendadas (recommend.py) viven en memoria. crud los mantiene al día en
+cada escritura, pero solo en el proceso que escribe: lo que escriben otros
+workers, bulk.py o matches.py no pasa por aquí.
+
+Esas escrituras sí suben su versión en cache_versions (http_cache.versions).
+Cada INDEX_SYNC_SECONDS se mira qué namespaces cambió otro proceso y se
+recargan enteros los índices que dependen de ellos (catalog_cache ya lo
+vacía versions.sync() al ver la escritura).
+"""
+import asyncio
+import logging
+import os
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+import draft, recommend, search
+from database import SessionLocal
+from http_cache import versions
+
+SYNC_SECONDS = float(os.getenv("INDEX_SYNC_SECONDS", "5"))
+
+# índice -> namespaces de los que depende
+DEPENDS = {
+    "search": {"champions", "items"},
+    "draft": {"champions", "cvc"},
+    "recommend": {"champions", "items", "builds"},
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _load(db: Session, nombre: str):
+    if nombre == "search":
+        search.rebuild(db)
+    elif nombre == "draft":
+        draft.matrix.load(db)
+    elif nombre == "recommend":
+        recommend.index.load(db)
+
+
+def load_all(db: Session):
+    """Arranque: carga todos los índices."""
+    # Lo escrito hasta ahora ya entra en la carga: no hace falta recargar después
+    versions.sync()
+    versions.pop_external()
+    search.init(db)
+    draft.matrix.load(db)
+    recommend.index.load(db)
+
+
+def reload_changed() -> set:
+    """Recarga los índices afectados por escrituras de otros procesos. Devuelve los namespaces."""
+    versions.sync()
+    changed = versions.pop_external()
+    if not changed:
+        return changed
+
+    with SessionLocal() as db:
+        for nombre, namespaces in DEPENDS.items():
+            if changed & namespaces:
+                _load(db, nombre)
+    return changed
+
+
+async def sync_periodically(interval: float = SYNC_SECONDS):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(reload_changed)
+        except Exception:
+            # Un fallo puntual (base caída) no debe matar la tarea
+            logger.exception("No se pudieron recargar los índices")
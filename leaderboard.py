@@ -0,0 +1,229 @@
+"""Ranking materializado de campeones (champion_leaderboard).
+
+Una fila por campeón activo con su puesto global y dentro de su rol, sus
+tasas y sus 3 ítems más usados, así /champions/list es un solo recorrido
+por índice en vez de ordenar champions y juntar champion_items + items.
+
+Cada refresco escribe una generación nueva completa y publica su número en
+leaderboard_generation (una sola fila) en la misma transacción; los lectores
+filtran por esa fila dentro de la misma consulta. Nadie ve una generación a
+medias, y la anterior se conserva hasta el siguiente refresco.
+
+Las escrituras de crud no lo tocan: reconstruirlo dentro de cada una
+bloquearía la fila de leaderboard_generation (todas las escrituras en fila)
+y sumaría O(campeones) a cada una. Lo que marca el ranking como pendiente es
+la versión que cada escritura ya sube en cache_versions (champions, items,
+builds): la generación guarda la versión con la que se construyó y, cada
+LEADERBOARD_REFRESH_SECONDS, refresh_periodically la reconstruye fuera de
+las transacciones de las peticiones si hay una más nueva, venga del proceso
+que venga. Además se reconstruye cada LEADERBOARD_MAX_AGE_SECONDS por si se
+escribió a mano en la base.
+
+crud llama a mark_dirty() después de cada commit que cambia el ranking: eso
+despierta a la tarea sin esperar al siguiente intervalo, o, con
+LEADERBOARD_REFRESH_SECONDS=0, reconstruye en el momento. Los formularios que
+redirigen a /champions/list llaman a refresh_if_stale() antes de redirigir,
+así la lista ya muestra el cambio.
+"""
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+import models, pagination
+from database import SessionLocal
+from http_cache import versions
+
+REFRESH_SECONDS = int(os.getenv("LEADERBOARD_REFRESH_SECONDS", "10"))
+MAX_AGE_SECONDS = int(os.getenv("LEADERBOARD_MAX_AGE_SECONDS", "300"))
+TOP_ITEMS = 3
+
+# Escrituras que cambian el ranking (ver http_cache.versions)
+NAMESPACES = ("champions", "items", "builds")
+
+logger = logging.getLogger(__name__)
+
+
+def source_version(db: Session) -> int:
+    """Última versión de cache_versions de lo que muestra el ranking."""
+    cv = models.CacheVersion
+    return db.scalar(
+        select(func.max(cv.version)).where(cv.namespace.in_(NAMESPACES), cv.entity_id == 0)
+    ) or 0
+
+
+COLUMNS = ("champion_id", "nombre", "rol", "tasa_victoria", "tasa_seleccion", "tasa_baneo",
+           "puesto", "puesto_rol", "top_items")
+
+
+def _build(db: Session):
+    """Filas del ranking calculadas desde champions / champion_items (sin generación)."""
+    champion = models.Champion
+    champions = db.execute(
+        select(champion.id, champion.nombre, champion.rol,
+               champion.tasa_victoria, champion.tasa_seleccion, champion.tasa_baneo)
+        .where(champion.activo == True)
+        .order_by(champion.tasa_victoria.desc(), champion.id.desc())
+    ).all()
+
+    ci, item = models.ChampionItem, models.Item
+    builds = defaultdict(list)
+    rows = db.execute(
+        select(ci.champion_id, ci.porcentaje_uso, item.id, item.nombre)
+        .join(item, item.id == ci.item_id)
+        .where(item.activo == True)
+    )
+    for champion_id, porcentaje_uso, item_id, nombre in rows:
+        builds[champion_id].append((porcentaje_uso or 0.0, -item_id, nombre))
+
+    por_rol = defaultdict(int)
+    filas = []
+    for puesto, c in enumerate(champions, start=1):
+        por_rol[c.rol] += 1
+        top = heapq.nlargest(TOP_ITEMS, builds.get(c.id, []))
+        filas.append({
+            "champion_id": c.id,
+            "nombre": c.nombre,
+            "rol": c.rol,
+            "tasa_victoria": c.tasa_victoria,
+            "tasa_seleccion": c.tasa_seleccion,
+            "tasa_baneo": c.tasa_baneo,
+            "puesto": puesto,
+            "puesto_rol": por_rol[c.rol],
+            "top_items": [{"id": -neg_id, "nombre": nombre, "porcentaje_uso": pct}
+                          for pct, neg_id, nombre in top],
+        })
+    return filas
+
+
+def _published(db: Session, generacion: int):
+    entry = models.LeaderboardEntry
+    rows = db.execute(
+        select(*(getattr(entry, c) for c in COLUMNS)).where(entry.generacion == generacion).order_by(entry.puesto)
+    ).all()
+    return [dict(zip(COLUMNS, row)) for row in rows]
+
+
+def refresh(db: Session):
+    """Construye y publica una generación nueva. No hace commit.
+
+    Si las filas salen iguales a las de la generación publicada no se
+    escribe ninguna (solo se apunta la versión de origen) y devuelve None:
+    así el ETag y la página en caché de /champions/list siguen valiendo.
+    """
+    gen = models.LeaderboardGeneration
+    # Se lee antes que los datos: lo que se escriba mientras tanto queda pendiente
+    fuente = source_version(db)
+
+    # El UPDATE bloquea la fila hasta el commit: dos refrescos a la vez se
+    # ordenan en vez de escribir la misma generación
+    nueva = db.execute(
+        update(gen).where(gen.id == 1).values(actual=gen.actual + 1, version=fuente).returning(gen.actual)
+    ).scalar()
+    if nueva is None:
+        nueva = 1
+        db.execute(insert(gen).values(id=1, actual=nueva, version=fuente))
+
+    filas = _build(db)
+    if nueva > 1 and filas == _published(db, nueva - 1):
+        db.execute(update(gen).where(gen.id == 1).values(actual=nueva - 1))
+        return None
+
+    if filas:
+        db.execute(insert(models.LeaderboardEntry), [{"generacion": nueva, **f} for f in filas])
+
+    # La generación anterior se queda: puede haber una lectura en curso
+    db.query(models.LeaderboardEntry).filter(
+        models.LeaderboardEntry.generacion < nueva - 1
+    ).delete(synchronize_session=False)
+    return nueva
+
+
+def page_query(rol: str = None, limit: int = 100, after: tuple = None):
+    """SELECT de una página del ranking; after = (puesto,) de la última fila."""
+    entry = models.LeaderboardEntry
+    actual = select(models.LeaderboardGeneration.actual).where(
+        models.LeaderboardGeneration.id == 1
+    ).scalar_subquery()
+
+    puesto = entry.puesto_rol if rol else entry.puesto
+    stmt = select(entry).where(entry.generacion == actual)
+    if rol:
+        stmt = stmt.where(entry.rol == rol)
+    stmt = pagination.after(stmt, [puesto], after)
+    return stmt.order_by(puesto).limit(limit)
+
+
+def list_page(db: Session, rol: str = None, limit: int = 100, after: tuple = None):
+    return db.execute(page_query(rol, limit, after)).scalars().all()
+
+
+_last_refresh = float("-inf")
+# Un refresco a la vez en este proceso: quien espera ve ya la generación nueva
+_lock = threading.RLock()
+# Tarea de refresh_periodically (para despertarla desde otros hilos)
+_loop = None
+_wake = None
+
+
+def refresh_now():
+    """Refresco con sesión propia (arranque y tarea periódica)."""
+    global _last_refresh
+    with _lock, SessionLocal() as db:
+        nueva = refresh(db)
+        db.commit()
+        _last_refresh = time.monotonic()
+    if nueva is not None:
+        versions.bump("leaderboard")
+    return nueva is not None
+
+
+def refresh_if_stale() -> bool:
+    """Reconstruye solo si hubo escrituras desde la generación actual (o si es muy vieja).
+
+    Devuelve si se publicó una generación nueva.
+    """
+    with _lock:
+        with SessionLocal() as db:
+            construida = db.scalar(
+                select(models.LeaderboardGeneration.version).where(models.LeaderboardGeneration.id == 1)
+            )
+            pendiente = construida is None or source_version(db) > construida
+        if not pendiente and time.monotonic() - _last_refresh < MAX_AGE_SECONDS:
+            return False
+        return refresh_now()
+
+
+def mark_dirty():
+    """Llamado desde crud después de un commit que cambia el ranking."""
+    if REFRESH_SECONDS <= 0:
+        try:
+            refresh_if_stale()
+        except Exception:
+            # La escritura ya está confirmada: que un fallo del ranking no la tumbe
+            logger.exception("No se pudo refrescar el ranking")
+    elif _loop is not None:
+        _loop.call_soon_threadsafe(_wake.set)
+
+
+async def refresh_periodically(interval: int = REFRESH_SECONDS):
+    global _loop, _wake
+    _loop, _wake = asyncio.get_running_loop(), asyncio.Event()
+    while True:
+        try:
+            await asyncio.wait_for(_wake.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+        try:
+            await run_in_threadpool(refresh_if_stale)
+        except Exception:
+            # Un fallo puntual (base caída) no debe matar la tarea
+            logger.exception("No se pudo refrescar el ranking")
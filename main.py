@@ -1,34 +1,74 @@
-from fastapi import FastAPI, Depends, Request
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+import asyncio
+
+from fastapi import FastAPI, Depends, Request, Query
+from fastapi.responses import HTMLResponse, JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import OperationalError
 
-from database import get_db, init_db
-from routers import champions, items, champion_items, cvc, userprofiles
-import crud
+import database
+from database import get_db, init_db, SessionLocal
+from routers import champions, items, champion_items, cvc, userprofiles, metrics, bulk, draft, export, matches
+import assets, crud, counters, history, http_cache, indexes, leaderboard, search as search_engine
+import templating
+from templating import templates
 
 app = FastAPI(title="Drporo")
+app.middleware("http")(http_cache.add_cache_headers)
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
+app.mount("/static", assets.AssetFiles(directory="static"), name="static")
 
 
 @app.on_event("startup")
 def startup_event():
+    templating.precompile()
     try:
         init_db()
+        with SessionLocal() as db:
+            counters.ensure_built(db)
+            history.ensure_built(db)
+            indexes.load_all(db)
+        leaderboard.refresh_now()
     except OperationalError:
         pass
 
 
+@app.on_event("startup")
+async def start_leaderboard_refresh():
+    # Reconstruye el ranking cuando hubo escrituras. Con LEADERBOARD_REFRESH_SECONDS=0 no
+    # hay tarea: cada escritura lo reconstruye en el momento (leaderboard.mark_dirty)
+    if leaderboard.REFRESH_SECONDS > 0:
+        app.state.leaderboard_task = asyncio.create_task(leaderboard.refresh_periodically())
+
+
+@app.on_event("startup")
+async def start_index_sync():
+    # Recoge en los índices en memoria lo que escriben otros procesos (INDEX_SYNC_SECONDS=0 la desactiva)
+    if indexes.SYNC_SECONDS > 0:
+        app.state.index_task = asyncio.create_task(indexes.sync_periodically())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for name in ("leaderboard_task", "index_task"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+    # aiosqlite / asyncpg mantienen hilos y conexiones abiertas hasta el dispose
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+
 # Routers
 app.include_router(champions.router)
 app.include_router(items.router)
 app.include_router(champion_items.router)
 app.include_router(cvc.router)
 app.include_router(userprofiles.router)
+app.include_router(metrics.router)
+app.include_router(bulk.router)
+app.include_router(draft.router)
+app.include_router(export.router)
+app.include_router(matches.router)
 
 
 # Root
@@ -39,21 +79,11 @@ def root(request: Request):
 
 # Search
 @app.get("/search")
-def search(request: Request, q: str = "", db: Session = Depends(get_db)):
-    champions_result = []
-    items_result = []
-
-    if q:
-        champions_result = (
-            db.query(crud.models.Champion)
-            .filter(crud.models.Champion.nombre.ilike(f"%{q}%"))
-            .all()
-        )
-        items_result = (
-            db.query(crud.models.Item)
-            .filter(crud.models.Item.nombre.ilike(f"%{q}%"))
-            .all()
-        )
+def search(request: Request, q: str = "", limit: int = Query(20, ge=1, le=50), db: Session = Depends(get_db)):
+    ranking = search_engine.backend.search(db, q, limit)
+
+    champions_result = crud.get_champions_by_ids(db, ranking["champions"])
+    items_result = crud.get_items_by_ids(db, ranking["items"])
 
     return templates.TemplateResponse("main/search.html", {
         "request": request,
@@ -61,3 +91,9 @@ def search(request: Request, q: str = "", db: Session = Depends(get_db)):
         "champions": champions_result,
         "items": items_result
     })
+
+
+# Autocompletado: no toca la base, responde desde el índice en memoria
+@app.get("/api/search/suggest")
+async def search_suggest(q: str = "", limit: int = Query(8, ge=1, le=20)):
+    return JSONResponse(search_engine.suggester.suggest(q, limit))
@@ -0,0 +1,295 @@
+"""Tasas calculadas a partir de partidas.
+
+En vez de escribir a mano winrates y porcentajes, se ingieren partidas
+(equipos, ítems de cada campeón, baneos y ganador):
+
+    POST /matches            lista JSON de partidas (ver routers/matches.py)
+    POST /matches/jsonl      archivo JSON Lines, una partida por línea
+    python matches.py partidas.jsonl --batch-size 1000
+
+Cada lote se reduce con NumPy a contadores (np.unique + np.bincount) y se
+suma a lo que ya había: las tasas guardadas junto con su tamaño de muestra
+(columnas muestras / baneos y match_totals.partidas) se vuelven a convertir
+en conteos, se acumulan y se recalculan. Así una tasa que venía de 10
+partidas pesa 10 y no se pisa con la del lote nuevo.
+
+Todo el lote se escribe con crud.write_match_stats en una transacción; el
+primer paso (crud.add_matches_played) bloquea la fila del total, así dos
+ingestas a la vez se ordenan en vez de perder conteos.
+"""
+import argparse
+import json
+import os
+import time
+from itertools import islice
+
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+import crud, models, schemas
+
+BATCH_SIZE = int(os.getenv("MATCH_BATCH_SIZE", "1000"))
+
+# Claves compuestas (a, b) -> a << 32 | b, para usar np.unique sobre pares
+_SHIFT = 32
+
+
+def _key(a, b):
+    return (a << _SHIFT) | b
+
+
+def _split(keys):
+    return keys >> _SHIFT, keys & ((1 << _SHIFT) - 1)
+
+
+def _as_counts(tasa, muestras):
+    # Las tasas salen de conteos enteros: rint recupera el conteo exacto
+    return np.rint(tasa * muestras / 100.0).astype(np.int64)
+
+
+class MatchBatch:
+    """Partidas de un lote, reducidas a contadores con counts()."""
+
+    def __init__(self):
+        self.partidas = 0
+        self._picks = []        # (champion_id, ganó)
+        self._bans = []
+        self._items = []        # _key(champion_id, item_id), una vez por partida
+        self._pairs = []        # (menor_id, mayor_id, ganó el menor)
+
+    def add(self, match: schemas.MatchRecord):
+        self.partidas += 1
+        azul_gana = match.ganador == "azul"
+
+        for equipo, gano in ((match.azul, azul_gana), (match.rojo, not azul_gana)):
+            for p in equipo:
+                self._picks.append((p.champion_id, gano))
+                self._items.extend(_key(p.champion_id, i) for i in set(p.items))
+
+        for a in match.azul:
+            for r in match.rojo:
+                if a.champion_id < r.champion_id:
+                    self._pairs.append((a.champion_id, r.champion_id, azul_gana))
+                elif a.champion_id > r.champion_id:
+                    self._pairs.append((r.champion_id, a.champion_id, not azul_gana))
+
+        self._bans.extend(set(match.baneos))
+
+    def counts(self) -> dict:
+        picks = np.array(self._picks, dtype=np.int64).reshape(-1, 2)
+        champion_ids, inv = np.unique(picks[:, 0], return_inverse=True)
+
+        pairs = np.array(self._pairs, dtype=np.int64).reshape(-1, 3)
+        pair_keys, pair_inv = np.unique(_key(pairs[:, 0], pairs[:, 1]), return_inverse=True)
+
+        ban_ids, baneos = np.unique(np.array(self._bans, dtype=np.int64), return_counts=True)
+        item_keys, con_item = np.unique(np.array(self._items, dtype=np.int64), return_counts=True)
+
+        return {
+            "champion_ids": champion_ids,
+            "jugadas": np.bincount(inv, minlength=len(champion_ids)),
+            "victorias": np.bincount(inv, weights=picks[:, 1], minlength=len(champion_ids)).astype(np.int64),
+            "ban_ids": ban_ids,
+            "baneos": baneos,
+            "item_keys": item_keys,
+            "con_item": con_item,
+            "pair_keys": pair_keys,
+            "pair_jugadas": np.bincount(pair_inv, minlength=len(pair_keys)),
+            "pair_victorias": np.bincount(pair_inv, weights=pairs[:, 2], minlength=len(pair_keys)).astype(np.int64),
+        }
+
+
+# ============================================================
+# ACUMULAR CONTRA LO GUARDADO
+# ============================================================
+
+def _champions(db: Session, c: dict, total: int):
+    champion = models.Champion
+    touched = np.union1d(c["champion_ids"], c["ban_ids"])
+    # El total de partidas cambió: selección y baneo de todo el que tenga muestra también
+    rows = db.query(
+        champion.id, champion.tasa_victoria, champion.muestras, champion.baneos
+    ).filter(
+        or_(champion.muestras > 0, champion.baneos > 0, champion.id.in_(touched.tolist()))
+    ).order_by(champion.id).all()
+
+    ids = np.array([r.id for r in rows], dtype=np.int64)
+    tasa = np.array([r.tasa_victoria or 0.0 for r in rows], dtype=np.float64)
+    muestras = np.array([r.muestras for r in rows], dtype=np.int64)
+    baneos = np.array([r.baneos for r in rows], dtype=np.int64)
+    victorias = _as_counts(tasa, muestras)
+
+    pos = np.searchsorted(ids, c["champion_ids"])
+    muestras[pos] += c["jugadas"]
+    victorias[pos] += c["victorias"]
+    baneos[np.searchsorted(ids, c["ban_ids"])] += c["baneos"]
+
+    tasa = np.where(muestras > 0, 100.0 * victorias / np.maximum(muestras, 1), tasa)
+    seleccion = 100.0 * muestras / total
+    baneo = 100.0 * baneos / total
+
+    rows = [
+        {"id": int(i), "tasa_victoria": float(t), "tasa_seleccion": float(s), "tasa_baneo": float(b),
+         "muestras": int(m), "baneos": int(n)}
+        for i, t, s, b, m, n in zip(ids, tasa, seleccion, baneo, muestras, baneos)
+    ]
+    return rows, ids, muestras
+
+
+def _builds(db: Session, c: dict, ids, muestras):
+    """porcentaje_uso = partidas con el ítem / partidas del campeón, para los campeones del lote."""
+    ci = models.ChampionItem
+    rows = db.query(ci.champion_id, ci.item_id, ci.porcentaje_uso, ci.muestras).filter(
+        ci.champion_id.in_(c["champion_ids"].tolist())
+    ).all()
+
+    old_keys = np.array([_key(r.champion_id, r.item_id) for r in rows], dtype=np.int64)
+    old_con = _as_counts(
+        np.array([r.porcentaje_uso or 0.0 for r in rows], dtype=np.float64),
+        np.array([r.muestras for r in rows], dtype=np.int64),
+    )
+
+    keys = np.union1d(old_keys, c["item_keys"])
+    con = np.zeros(len(keys), dtype=np.int64)
+    con[np.searchsorted(keys, old_keys)] += old_con
+    con[np.searchsorted(keys, c["item_keys"])] += c["con_item"]
+
+    champion_ids, item_ids = _split(keys)
+    partidas = muestras[np.searchsorted(ids, champion_ids)]
+    porcentaje = 100.0 * con / np.maximum(partidas, 1)
+
+    return [
+        {"champion_id": int(ch), "item_id": int(it), "porcentaje_uso": float(p), "muestras": int(m)}
+        for ch, it, p, m in zip(champion_ids, item_ids, porcentaje, partidas)
+    ]
+
+
+def _matchups(db: Session, c: dict):
+    """(menor, mayor, winrate del menor, partidas); crud escribe también el espejo."""
+    if not len(c["pair_keys"]):
+        return []
+    cvc = models.ChampionVsChampion
+    menores, _ = _split(c["pair_keys"])
+    rows = db.query(cvc.champion_id, cvc.oponente_id, cvc.winrate, cvc.muestras).filter(
+        cvc.champion_id.in_(np.unique(menores).tolist()),
+        cvc.champion_id < cvc.oponente_id
+    ).all()
+
+    old_keys = np.array([_key(r.champion_id, r.oponente_id) for r in rows], dtype=np.int64)
+    old_muestras = np.array([r.muestras for r in rows], dtype=np.int64)
+    old_victorias = _as_counts(np.array([r.winrate or 0.0 for r in rows], dtype=np.float64), old_muestras)
+
+    keys = c["pair_keys"]
+    muestras = c["pair_jugadas"].copy()
+    victorias = c["pair_victorias"].copy()
+    # Solo interesan los pares guardados que también están en el lote
+    found = np.isin(old_keys, keys)
+    pos = np.searchsorted(keys, old_keys[found])
+    muestras[pos] += old_muestras[found]
+    victorias[pos] += old_victorias[found]
+
+    winrate = 100.0 * victorias / muestras
+    menores, mayores = _split(keys)
+    return [(int(a), int(b), float(w), int(m)) for a, b, w, m in zip(menores, mayores, winrate, muestras)]
+
+
+def apply(db: Session, batch: MatchBatch) -> dict:
+    """Suma el lote a las estadísticas guardadas y hace commit."""
+    c = batch.counts()
+    try:
+        total = crud.add_matches_played(db, batch.partidas)
+        champions, ids, muestras = _champions(db, c, total)
+        builds = _builds(db, c, ids, muestras)
+        matchups = _matchups(db, c)
+        crud.write_match_stats(db, champions, builds, matchups)
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"partidas_totales": total, "campeones": len(champions), "builds": len(builds), "matchups": len(matchups)}
+
+
+# ============================================================
+# INGESTA
+# ============================================================
+
+def _known_ids(db: Session):
+    return (
+        {i for i, in db.query(models.Champion.id)},
+        {i for i, in db.query(models.Item.id)},
+    )
+
+
+def _parse(raw, champions, items):
+    """MatchRecord válido o None (schema inválido o ids que no existen)."""
+    try:
+        if isinstance(raw, str):
+            raw = json.loads(raw)
+        match = raw if isinstance(raw, schemas.MatchRecord) else schemas.MatchRecord(**raw)
+    except (ValueError, TypeError):
+        return None
+
+    participantes = match.azul + match.rojo
+    ids = [p.champion_id for p in participantes]
+    if len(set(ids)) != len(ids):
+        return None
+    if not champions.issuperset(ids) or not champions.issuperset(match.baneos):
+        return None
+    if any(not items.issuperset(p.items) for p in participantes):
+        return None
+    return match
+
+
+def ingest(db: Session, records, batch_size: int = BATCH_SIZE) -> dict:
+    """records: MatchRecord, dicts o líneas JSON. Un commit por lote."""
+    started = time.perf_counter()
+    champions, items = _known_ids(db)
+    records = iter(records)
+
+    report = {"recibidas": 0, "ingeridas": 0, "rechazadas": 0, "partidas_totales": crud.get_matches_played(db),
+              "campeones": 0, "builds": 0, "matchups": 0}
+
+    while True:
+        chunk = list(islice(records, batch_size))
+        if not chunk:
+            break
+
+        batch = MatchBatch()
+        for raw in chunk:
+            match = _parse(raw, champions, items)
+            if match is None:
+                report["rechazadas"] += 1
+            else:
+                batch.add(match)
+        report["recibidas"] += len(chunk)
+        if not batch.partidas:
+            continue
+
+        written = apply(db, batch)
+        report["ingeridas"] += batch.partidas
+        report["partidas_totales"] = written["partidas_totales"]
+        for key in ("campeones", "builds", "matchups"):
+            report[key] += written[key]
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingesta de partidas para DrPoro")
+    parser.add_argument("path", help="JSON Lines, una partida por línea")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    from database import SessionLocal, init_db
+    init_db()
+
+    with open(args.path, encoding="utf-8") as stream, SessionLocal() as db:
+        report = ingest(db, (line for line in stream if line.strip()), max(args.batch_size, 1))
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
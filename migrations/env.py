@@ -0,0 +1,43 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from database import Base, engine
+import models  # registra las tablas en Base.metadata (para --autogenerate)
+
+config = context.config
+
+# Desde init_db() no se toca el logging de la app (uvicorn ya lo configuró)
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite no tiene ALTER TABLE ... ADD CONSTRAINT: batch recrea la tabla
+            render_as_batch=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,107 @@
+"""Esquema base (el que creaba Base.metadata.create_all)
+
+Las instalaciones anteriores a Alembic ya tienen todas o parte de estas
+tablas, según la versión con la que arrancaron. Por eso esta migración solo
+crea lo que falta (checkfirst) en vez de fallar: sirve igual para una base
+vacía que para una existente.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def tables(meta):
+    sa.Table(
+        "champions", meta,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("nombre", sa.String, unique=True, index=True, nullable=False),
+        sa.Column("rol", sa.String, nullable=False),
+        sa.Column("tasa_victoria", sa.Float),
+        sa.Column("tasa_seleccion", sa.Float),
+        sa.Column("tasa_baneo", sa.Float),
+        sa.Column("activo", sa.Boolean),
+        sa.Index("ix_champions_activo_id", "activo", "id"),
+        sa.Index("ix_champions_activo_winrate", "activo", "tasa_victoria", "id"),
+        sa.Index("ix_champions_activo_rol_winrate", "activo", "rol", "tasa_victoria", "id"),
+    )
+    sa.Table(
+        "items", meta,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("nombre", sa.String, unique=True, nullable=False),
+        sa.Column("tipo", sa.String),
+        sa.Column("porcentaje_uso", sa.Float),
+        sa.Column("activo", sa.Boolean),
+        sa.Index("ix_items_activo_id", "activo", "id"),
+    )
+    sa.Table(
+        "userprofiles", meta,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("nombre_perfil", sa.String, nullable=False),
+        sa.Column("nombre_cuenta", sa.String, nullable=False),
+        sa.Column("region", sa.String),
+        sa.Column("foto", sa.String),
+    )
+    sa.Table(
+        "champion_items", meta,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("champion_id", sa.Integer, sa.ForeignKey("champions.id"), nullable=False),
+        sa.Column("item_id", sa.Integer, sa.ForeignKey("items.id"), nullable=False),
+        sa.Column("porcentaje_uso", sa.Float),
+    )
+    sa.Table(
+        "userprofile_favorite_champions", meta,
+        sa.Column("userprofile_id", sa.Integer, sa.ForeignKey("userprofiles.id"), primary_key=True),
+        sa.Column("champion_id", sa.Integer, sa.ForeignKey("champions.id"), primary_key=True),
+    )
+    sa.Table(
+        "profiles", meta,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("champion_id", sa.Integer, sa.ForeignKey("champions.id"), unique=True),
+        sa.Column("descripcion", sa.String),
+        sa.Column("historia", sa.String),
+    )
+    sa.Table(
+        "champion_vs_champion", meta,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("champion_id", sa.Integer, sa.ForeignKey("champions.id"), nullable=False),
+        sa.Column("oponente_id", sa.Integer, sa.ForeignKey("champions.id"), nullable=False),
+        sa.Column("winrate", sa.Float),
+        sa.UniqueConstraint("champion_id", "oponente_id", name="_champ_opon_uc"),
+        sa.Index("ix_cvc_champion_page", "champion_id", "id"),
+    )
+    sa.Table(
+        "champion_counters", meta,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("champion_id", sa.Integer, sa.ForeignKey("champions.id"), nullable=False),
+        sa.Column("tipo", sa.String, nullable=False),
+        sa.Column("rol", sa.String, nullable=False),
+        sa.Column("posicion", sa.Integer, nullable=False),
+        sa.Column("oponente_id", sa.Integer, sa.ForeignKey("champions.id"), nullable=False),
+        sa.Column("winrate", sa.Float, nullable=False),
+        sa.Index("ix_champion_counters_lookup", "champion_id", "tipo", "rol", "posicion"),
+    )
+    return meta
+
+
+def upgrade():
+    bind = op.get_bind()
+    meta = tables(sa.MetaData())
+    meta.create_all(bind, checkfirst=True)
+
+    # create_all no añade índices a tablas que ya existían
+    for table in meta.sorted_tables:
+        for index in table.indexes:
+            index.create(bind, checkfirst=True)
+
+
+def downgrade():
+    meta = tables(sa.MetaData())
+    meta.drop_all(op.get_bind())
@@ -0,0 +1,41 @@
+"""UNIQUE (champion_id, item_id) en champion_items e índice de oponente_id
+
+champion_items no impedía duplicar un par campeón-ítem (dos POST a la vez
+pasaban los dos el "check" de add_item_to_champion). Antes de crear la
+restricción se deja una fila por par: la de id más alto, que es la última
+que se escribió.
+
+champion_vs_champion solo tenía la UNIQUE (champion_id, oponente_id); las
+búsquedas por oponente (rivales de un campeón, borrar sus matchups) no
+tenían índice.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "DELETE FROM champion_items WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM champion_items "
+        "GROUP BY champion_id, item_id) AS keep)"
+    )
+
+    with op.batch_alter_table("champion_items") as batch:
+        batch.create_unique_constraint("_champ_item_uc", ["champion_id", "item_id"])
+
+    op.create_index("ix_cvc_oponente_id", "champion_vs_champion", ["oponente_id"])
+
+
+def downgrade():
+    op.drop_index("ix_cvc_oponente_id", table_name="champion_vs_champion")
+
+    with op.batch_alter_table("champion_items") as batch:
+        batch.drop_constraint("_champ_item_uc", type_="unique")
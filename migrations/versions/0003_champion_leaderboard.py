@@ -0,0 +1,56 @@
+"""Ranking materializado: champion_leaderboard y leaderboard_generation
+
+/champions/list pasa a leer champion_leaderboard (ver leaderboard.py), así
+que los índices por tasa_victoria de champions ya no los usa nadie.
+
+La tabla se llena al arrancar la app (leaderboard.refresh_now en main.py).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    generation = op.create_table(
+        "leaderboard_generation",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("actual", sa.Integer, nullable=False),
+    )
+    op.bulk_insert(generation, [{"id": 1, "actual": 0}])
+
+    op.create_table(
+        "champion_leaderboard",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("generacion", sa.Integer, nullable=False),
+        sa.Column("champion_id", sa.Integer, sa.ForeignKey("champions.id"), nullable=False),
+        sa.Column("nombre", sa.String, nullable=False),
+        sa.Column("rol", sa.String, nullable=False),
+        sa.Column("tasa_victoria", sa.Float),
+        sa.Column("tasa_seleccion", sa.Float),
+        sa.Column("tasa_baneo", sa.Float),
+        sa.Column("puesto", sa.Integer, nullable=False),
+        sa.Column("puesto_rol", sa.Integer, nullable=False),
+        sa.Column("top_items", sa.JSON, nullable=False),
+    )
+    op.create_index("ix_champion_leaderboard_id", "champion_leaderboard", ["id"])
+    op.create_index("ix_leaderboard_puesto", "champion_leaderboard", ["generacion", "puesto"])
+    op.create_index("ix_leaderboard_rol_puesto", "champion_leaderboard", ["generacion", "rol", "puesto_rol"])
+
+    op.drop_index("ix_champions_activo_winrate", table_name="champions")
+    op.drop_index("ix_champions_activo_rol_winrate", table_name="champions")
+
+
+def downgrade():
+    op.create_index("ix_champions_activo_rol_winrate", "champions", ["activo", "rol", "tasa_victoria", "id"])
+    op.create_index("ix_champions_activo_winrate", "champions", ["activo", "tasa_victoria", "id"])
+
+    op.drop_table("champion_leaderboard")
+    op.drop_table("leaderboard_generation")
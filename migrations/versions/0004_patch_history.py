@@ -0,0 +1,75 @@
+"""Histórico por parche: patches, *_history y champion_trends
+
+Las tablas se llenan solas: al arrancar, history.ensure_built guarda los
+valores actuales como primer parche (PARCHE_ACTUAL) y a partir de ahí cada
+escritura de crud deja su foto.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "patches",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("nombre", sa.String, nullable=False),
+    )
+    op.create_index("ix_patches_id", "patches", ["id"])
+
+    op.create_table(
+        "champion_stats_history",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("champion_id", sa.Integer, sa.ForeignKey("champions.id"), nullable=False),
+        sa.Column("parche_id", sa.Integer, sa.ForeignKey("patches.id"), nullable=False),
+        sa.Column("tasa_victoria", sa.Float),
+        sa.Column("tasa_seleccion", sa.Float),
+        sa.Column("tasa_baneo", sa.Float),
+        sa.UniqueConstraint("champion_id", "parche_id", name="_champ_stats_parche_uc"),
+    )
+    op.create_index("ix_champion_stats_history_id", "champion_stats_history", ["id"])
+
+    op.create_table(
+        "champion_items_history",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("champion_id", sa.Integer, sa.ForeignKey("champions.id"), nullable=False),
+        sa.Column("item_id", sa.Integer, sa.ForeignKey("items.id"), nullable=False),
+        sa.Column("parche_id", sa.Integer, sa.ForeignKey("patches.id"), nullable=False),
+        sa.Column("porcentaje_uso", sa.Float),
+        sa.UniqueConstraint("champion_id", "item_id", "parche_id", name="_champ_item_parche_uc"),
+    )
+    op.create_index("ix_champion_items_history_id", "champion_items_history", ["id"])
+
+    op.create_table(
+        "champion_vs_champion_history",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("champion_id", sa.Integer, sa.ForeignKey("champions.id"), nullable=False),
+        sa.Column("oponente_id", sa.Integer, sa.ForeignKey("champions.id"), nullable=False),
+        sa.Column("parche_id", sa.Integer, sa.ForeignKey("patches.id"), nullable=False),
+        sa.Column("winrate", sa.Float),
+        sa.UniqueConstraint("champion_id", "oponente_id", "parche_id", name="_champ_opon_parche_uc"),
+    )
+    op.create_index("ix_champion_vs_champion_history_id", "champion_vs_champion_history", ["id"])
+
+    op.create_table(
+        "champion_trends",
+        sa.Column("champion_id", sa.Integer, sa.ForeignKey("champions.id"), primary_key=True),
+        sa.Column("parches", sa.JSON, nullable=False),
+        sa.Column("series", sa.LargeBinary, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("champion_trends")
+    op.drop_table("champion_vs_champion_history")
+    op.drop_table("champion_items_history")
+    op.drop_table("champion_stats_history")
+    op.drop_table("patches")
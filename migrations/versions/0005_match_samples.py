@@ -0,0 +1,50 @@
+"""Tamaños de muestra (muestras / baneos) y total de partidas ingeridas
+
+Las filas existentes quedan con muestras = 0: sus tasas se escribieron a
+mano y no pesan nada frente a las primeras partidas que se ingieran (ver
+matches.py).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("champions") as batch:
+        batch.add_column(sa.Column("muestras", sa.Integer, nullable=False, server_default="0"))
+        batch.add_column(sa.Column("baneos", sa.Integer, nullable=False, server_default="0"))
+
+    with op.batch_alter_table("champion_items") as batch:
+        batch.add_column(sa.Column("muestras", sa.Integer, nullable=False, server_default="0"))
+
+    with op.batch_alter_table("champion_vs_champion") as batch:
+        batch.add_column(sa.Column("muestras", sa.Integer, nullable=False, server_default="0"))
+
+    totals = op.create_table(
+        "match_totals",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("partidas", sa.Integer, nullable=False),
+    )
+    op.bulk_insert(totals, [{"id": 1, "partidas": 0}])
+
+
+def downgrade():
+    op.drop_table("match_totals")
+
+    with op.batch_alter_table("champion_vs_champion") as batch:
+        batch.drop_column("muestras")
+
+    with op.batch_alter_table("champion_items") as batch:
+        batch.drop_column("muestras")
+
+    with op.batch_alter_table("champions") as batch:
+        batch.drop_column("baneos")
+        batch.drop_column("muestras")
@@ -0,0 +1,33 @@
+"""Contador de perfiles que tienen a cada campeón en favoritos
+
+champions.favoritos_count se rellena una vez desde
+userprofile_favorite_champions; a partir de aquí lo mantiene crud en la
+misma transacción que la tabla intermedia.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("champions") as batch:
+        batch.add_column(sa.Column("favoritos_count", sa.Integer, nullable=False, server_default="0"))
+
+    op.execute(
+        "UPDATE champions SET favoritos_count = ("
+        " SELECT COUNT(*) FROM userprofile_favorite_champions f"
+        " WHERE f.champion_id = champions.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("champions") as batch:
+        batch.drop_column("favoritos_count")
@@ -0,0 +1,31 @@
+"""Versiones de caché compartidas entre procesos (ETags y páginas en caché)
+
+Hasta ahora cada worker llevaba sus contadores en memoria y no veía las
+escrituras de los demás ni las de bulk.py / matches.py.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cache_versions",
+        sa.Column("namespace", sa.String, primary_key=True),
+        sa.Column("entity_id", sa.Integer, primary_key=True),
+        sa.Column("version", sa.Integer, nullable=False),
+        sa.Column("modificado", sa.Float, nullable=False),
+    )
+    op.create_index("ix_cache_versions_version", "cache_versions", ["version"])
+
+
+def downgrade():
+    op.drop_table("cache_versions")
@@ -0,0 +1,27 @@
+"""Versión de los datos con la que se construyó el ranking
+
+El ranking deja de reconstruirse dentro de cada escritura: la tarea
+periódica lo rehace cuando cache_versions tiene una versión más nueva
+que leaderboard_generation.version.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("leaderboard_generation") as batch:
+        batch.add_column(sa.Column("version", sa.Integer, nullable=False, server_default="0"))
+
+
+def downgrade():
+    with op.batch_alter_table("leaderboard_generation") as batch:
+        batch.drop_column("version")
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Table, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import select, Column, Integer, String, Float, Boolean, ForeignKey, Table, UniqueConstraint, Index, JSON, LargeBinary
+from sqlalchemy.orm import object_session, relationship
 from database import Base
 
 # ============================================================
@@ -13,6 +13,11 @@ class ChampionItem(Base):
     champion_id = Column(Integer, ForeignKey("champions.id"), nullable=False)
     item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
     porcentaje_uso = Column(Float, default=0.0)
+    muestras = Column(Integer, nullable=False, default=0, server_default="0")  # partidas del campeón detrás de porcentaje_uso
+
+    __table_args__ = (
+        UniqueConstraint("champion_id", "item_id", name="_champ_item_uc"),
+    )
 
 userprofile_favorite_champions = Table(
     "userprofile_favorite_champions",
@@ -36,6 +41,14 @@ class Champion(Base):
     tasa_seleccion = Column(Float, default=0.0)
     tasa_baneo = Column(Float, default=0.0)
 
+    # Tamaño de muestra de las tasas cuando salen de partidas (ver matches.py)
+    muestras = Column(Integer, nullable=False, default=0, server_default="0")   # partidas jugadas
+    baneos = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Perfiles que lo tienen en favoritos; lo mantiene crud en la misma
+    # transacción que userprofile_favorite_champions (sin COUNT al leer)
+    favoritos_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     activo = Column(Boolean, default=True)
 
     usuarios_favoritos = relationship(
@@ -70,6 +83,12 @@ class Champion(Base):
         cascade="all, delete-orphan"
     )
 
+    # Los listados filtran activo en SQL y paginan por id (el ranking se
+    # lee de champion_leaderboard)
+    __table_args__ = (
+        Index("ix_champions_activo_id", "activo", "id"),
+    )
+
 # ============================================================
 # 🟦 MODELO Profile (información extendida del campeón)
 # ============================================================
@@ -103,6 +122,10 @@ class Item(Base):
         back_populates="items"
     )
 
+    __table_args__ = (
+        Index("ix_items_activo_id", "activo", "id"),
+    )
+
 # ============================================================
 # 🟥 MODELO Champion vs Champion (matchups)
 # ============================================================
@@ -116,6 +139,7 @@ class ChampionVsChampion(Base):
     oponente_id = Column(Integer, ForeignKey("champions.id"), nullable=False)
 
     winrate = Column(Float, default=50.0)
+    muestras = Column(Integer, nullable=False, default=0, server_default="0")  # partidas entre los dos
 
     champion = relationship(
         "Champion",
@@ -129,8 +153,177 @@ class ChampionVsChampion(Base):
 
     __table_args__ = (
         UniqueConstraint('champion_id', 'oponente_id', name='_champ_opon_uc'),
+        # Listado filtrado por campeón y paginado por id
+        Index("ix_cvc_champion_page", "champion_id", "id"),
+        Index("ix_cvc_oponente_id", "oponente_id"),
+    )
+
+# ============================================================
+# 🟥 MODELO ChampionCounter (counters materializados)
+# ============================================================
+
+class ChampionCounter(Base):
+    """Top-K de mejores y peores matchups de cada campeón.
+
+    Se recalcula desde champion_vs_champion cada vez que crud toca un par
+    (ver counters.py), así la página de detalle lo lee en O(K).
+    """
+    __tablename__ = "champion_counters"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    champion_id = Column(Integer, ForeignKey("champions.id"), nullable=False)
+    tipo = Column(String, nullable=False)        # "counter" (le gana a él) | "victima" (él le gana)
+    rol = Column(String, nullable=False, default="")    # rol del oponente, "" = todos los roles
+    posicion = Column(Integer, nullable=False)
+    oponente_id = Column(Integer, ForeignKey("champions.id"), nullable=False)
+    winrate = Column(Float, nullable=False)
+
+    oponente = relationship("Champion", foreign_keys=[oponente_id])
+
+    __table_args__ = (
+        Index("ix_champion_counters_lookup", "champion_id", "tipo", "rol", "posicion"),
+    )
+
+# ============================================================
+# 🟥 MODELO LeaderboardEntry (ranking materializado)
+# ============================================================
+
+class LeaderboardGeneration(Base):
+    """Una sola fila (id=1): la generación de champion_leaderboard que se lee."""
+    __tablename__ = "leaderboard_generation"
+
+    id = Column(Integer, primary_key=True)
+    actual = Column(Integer, nullable=False, default=0)
+    # Versión de cache_versions con la que se construyó (ver leaderboard.refresh_if_stale)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class LeaderboardEntry(Base):
+    """Puesto de un campeón activo en una generación del ranking (ver leaderboard.py)."""
+    __tablename__ = "champion_leaderboard"
+
+    id = Column(Integer, primary_key=True, index=True)
+    generacion = Column(Integer, nullable=False)
+
+    champion_id = Column(Integer, ForeignKey("champions.id"), nullable=False)
+    nombre = Column(String, nullable=False)
+    rol = Column(String, nullable=False)
+
+    tasa_victoria = Column(Float)
+    tasa_seleccion = Column(Float)
+    tasa_baneo = Column(Float)
+
+    puesto = Column(Integer, nullable=False)        # por tasa_victoria entre todos
+    puesto_rol = Column(Integer, nullable=False)    # por tasa_victoria dentro de su rol
+    top_items = Column(JSON, nullable=False, default=list)     # [{"id", "nombre", "porcentaje_uso"}]
+
+    __table_args__ = (
+        Index("ix_leaderboard_puesto", "generacion", "puesto"),
+        Index("ix_leaderboard_rol_puesto", "generacion", "rol", "puesto_rol"),
+    )
+
+# ============================================================
+# 🟧 MODELO MatchTotals (partidas ingeridas)
+# ============================================================
+
+class MatchTotals(Base):
+    """Una sola fila (id=1): partidas ingeridas, el denominador de selección y baneo."""
+    __tablename__ = "match_totals"
+
+    id = Column(Integer, primary_key=True)
+    partidas = Column(Integer, nullable=False, default=0)
+
+# ============================================================
+# ⬜ MODELO CacheVersion (versiones para ETags, ver http_cache.py)
+# ============================================================
+
+class CacheVersion(Base):
+    """Última versión de una colección o de una entidad, compartida entre procesos.
+
+    version sale de un contador global (la fila namespace="", entity_id=0),
+    así cada proceso lee solo lo que cambió desde su última lectura.
+    """
+    __tablename__ = "cache_versions"
+
+    namespace = Column(String, primary_key=True)
+    entity_id = Column(Integer, primary_key=True)      # 0 = la colección entera
+    version = Column(Integer, nullable=False)
+    modificado = Column(Float, nullable=False)         # epoch, para Last-Modified
+
+    __table_args__ = (
+        Index("ix_cache_versions_version", "version"),
+    )
+
+# ============================================================
+# 🟪 HISTÓRICO POR PARCHE (ver history.py)
+# ============================================================
+
+class Patch(Base):
+    __tablename__ = "patches"
+
+    id = Column(Integer, primary_key=True, index=True)     # orden cronológico
+    nombre = Column(String, nullable=False)
+
+
+class ChampionStatHistory(Base):
+    __tablename__ = "champion_stats_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    champion_id = Column(Integer, ForeignKey("champions.id"), nullable=False)
+    parche_id = Column(Integer, ForeignKey("patches.id"), nullable=False)
+
+    tasa_victoria = Column(Float)
+    tasa_seleccion = Column(Float)
+    tasa_baneo = Column(Float)
+
+    __table_args__ = (
+        UniqueConstraint("champion_id", "parche_id", name="_champ_stats_parche_uc"),
     )
 
+
+class ChampionItemHistory(Base):
+    __tablename__ = "champion_items_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    champion_id = Column(Integer, ForeignKey("champions.id"), nullable=False)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    parche_id = Column(Integer, ForeignKey("patches.id"), nullable=False)
+
+    porcentaje_uso = Column(Float)
+
+    __table_args__ = (
+        UniqueConstraint("champion_id", "item_id", "parche_id", name="_champ_item_parche_uc"),
+    )
+
+
+class MatchupHistory(Base):
+    __tablename__ = "champion_vs_champion_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    champion_id = Column(Integer, ForeignKey("champions.id"), nullable=False)
+    oponente_id = Column(Integer, ForeignKey("champions.id"), nullable=False)
+    parche_id = Column(Integer, ForeignKey("patches.id"), nullable=False)
+
+    winrate = Column(Float)
+
+    __table_args__ = (
+        UniqueConstraint("champion_id", "oponente_id", "parche_id", name="_champ_opon_parche_uc"),
+    )
+
+
+class ChampionTrend(Base):
+    """Series por parche de un campeón ya calculadas, para las gráficas.
+
+    series = float64 little-endian, una serie detrás de otra en el orden de
+    history.SERIES, cada una con len(parches) valores.
+    """
+    __tablename__ = "champion_trends"
+
+    champion_id = Column(Integer, ForeignKey("champions.id"), primary_key=True)
+    parches = Column(JSON, nullable=False)
+    series = Column(LargeBinary, nullable=False)
+
 # ============================================================
 # 🟨 MODELO UserProfile
 # ============================================================
@@ -153,4 +346,12 @@ class UserProfile(Base):
 
     @property
     def campeones_favoritos_ids(self):
-        return [c.id for c in self.campeones_favoritos]
+        # Si la relación ya vino cargada (get_userprofile_view) se usa; si no,
+        # basta con leer los ids de la tabla intermedia, sin cargar los campeones
+        if "campeones_favoritos" in self.__dict__:
+            return [c.id for c in self.campeones_favoritos]
+        return object_session(self).scalars(
+            select(userprofile_favorite_champions.c.champion_id)
+            .where(userprofile_favorite_champions.c.userprofile_id == self.id)
+            .order_by(userprofile_favorite_champions.c.champion_id)
+        ).all()
@@ -0,0 +1,76 @@
+"""Paginación por cursor (keyset) para los listados.
+
+En vez de offset(skip), cada página pide las filas posteriores a la última
+clave vista: WHERE (tasa_victoria, id) < (:tv, :id) ORDER BY ... LIMIT n.
+Con un índice sobre esas columnas la página 1000 cuesta lo mismo que la 1.
+
+El cursor que ve el cliente es esa clave en JSON + base64, opaco a propósito:
+se puede cambiar el formato sin romper a nadie que lo trate como un token.
+"""
+import base64
+import binascii
+import json
+from typing import Optional, Sequence
+from urllib.parse import urlencode
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import tuple_
+
+# Ningún listado devuelve más de esto por página, pida lo que pida el cliente
+MAX_LIMIT = 200
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int = 1) -> Optional[tuple]:
+    """Clave del cursor, o None si no hay. HTTP 400 si el cursor no es válido."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(400, "Cursor inválido")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(400, "Cursor inválido")
+    return tuple(values)
+
+
+def after(query, columns: Sequence, key: Optional[tuple], descending: bool = False):
+    """Filtra las filas que van después de key en el orden de columns."""
+    if key is None:
+        return query
+    if len(columns) == 1:
+        col, value = columns[0], key[0]
+    else:
+        col, value = tuple_(*columns), tuple_(*key)
+    return query.filter(col < value if descending else col > value)
+
+
+def next_cursor(rows, limit: int, key) -> Optional[str]:
+    """Cursor de la página siguiente; None si esta fue la última."""
+    if len(rows) < limit:
+        return None
+    return encode_cursor(*key(rows[-1]))
+
+
+def link_next(request: Request, response: Response, cursor: Optional[str]):
+    """Publica el cursor siguiente en X-Next-Cursor y en Link (RFC 8288)."""
+    if not cursor:
+        return
+    params = {k: v for k, v in request.query_params.items() if k not in ("cursor", "skip")}
+    params["cursor"] = cursor
+    response.headers["X-Next-Cursor"] = cursor
+    response.headers["Link"] = f'<{request.url.path}?{urlencode(params)}>; rel="next"'
+
+
+def page_url(request: Request, cursor: Optional[str]) -> Optional[str]:
+    """URL de la misma página HTML con otro cursor (None = primera página)."""
+    params = {k: v for k, v in request.query_params.items() if k != "cursor"}
+    if cursor:
+        params["cursor"] = cursor
+    return f"{request.url.path}?{urlencode(params)}" if params else request.url.path
@@ -0,0 +1,219 @@
+import os
+import threading
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+import models
+
+# Cuántos ítems "suelen ir con" se guardan por ítem
+COOC_TOP_K = int(os.getenv("BUILDS_COOC_TOP_K", "5"))
+
+
+class BuildIndex:
+    """Builds recomendadas, precalculadas en memoria desde champion_items.
+
+    uso[c, i] es el porcentaje_uso del ítem i en el campeón c. A partir de
+    esa matriz se guardan ya ordenados:
+
+    - ranked[champion_id]: sus ítems de más a menos usado;
+    - by_role[rol]: uso medio de cada ítem entre los campeones activos del rol;
+    - cooc[item_id]: con qué ítems comparte build más a menudo (en cuántos
+      campeones aparecen juntos).
+
+    Igual que draft.matrix: se carga al arrancar y crud lo mantiene al día
+    (refresh en cada escritura de builds), así pedir el top-N es cortar una
+    lista ya ordenada, O(N), sin tocar la base.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self, n_champions=0, n_items=0):
+        # Los arrays tienen capacidad de sobra (ver _grow_*): las filas y
+        # columnas sin usar quedan inactivas y a 0, no entran en los rankings
+        self.champions = {}         # champion_id -> fila
+        self.items = {}             # item_id -> columna
+        self.champion_ids = np.zeros(n_champions, dtype=np.int64)
+        self.item_ids = np.zeros(n_items, dtype=np.int64)
+        self.roles = np.empty(n_champions, dtype=object)
+        self.activos = np.zeros(n_champions, dtype=bool)
+        self.items_activos = np.zeros(n_items, dtype=bool)
+        self.nombres = {}           # item_id -> nombre
+        self.uso = np.zeros((n_champions, n_items), dtype=np.float32)
+
+        self.ranked = {}
+        self.by_role = {}
+        self.cooc = {}
+
+    def load(self, db: Session):
+        champions = db.query(models.Champion.id, models.Champion.rol, models.Champion.activo).all()
+        items = db.query(models.Item.id, models.Item.nombre, models.Item.activo).all()
+        builds = db.query(
+            models.ChampionItem.champion_id, models.ChampionItem.item_id, models.ChampionItem.porcentaje_uso
+        ).all()
+
+        with self._lock:
+            self._reset(len(champions), len(items))
+            for champion in champions:
+                self._set_champion(*champion)
+            for item in items:
+                self._set_item(*item)
+            self._set_builds(builds)
+            self.ranked = {cid: self._rank_champion(row) for cid, row in self.champions.items()}
+            self._rank_shared()
+
+    # ---------------- escrituras (llamadas desde crud) ----------------
+
+    def refresh(self, db: Session, champion_ids):
+        """Vuelve a leer las builds de esos campeones y recalcula los rankings."""
+        champion_ids = set(champion_ids)
+        if not champion_ids:
+            return
+        builds = db.query(
+            models.ChampionItem.champion_id, models.ChampionItem.item_id, models.ChampionItem.porcentaje_uso
+        ).filter(models.ChampionItem.champion_id.in_(champion_ids)).all()
+
+        if any(b.item_id not in self.items or b.champion_id not in self.champions for b in builds):
+            # Campeón o ítem que este proceso aún no conoce (lo creó otro worker): recarga completa
+            self.load(db)
+            return
+
+        with self._lock:
+            for cid in champion_ids:
+                if cid in self.champions:
+                    self.uso[self.champions[cid], :] = 0.0
+            self._set_builds(builds)
+            ranked = dict(self.ranked)
+            for cid in champion_ids:
+                if cid in self.champions:
+                    ranked[cid] = self._rank_champion(self.champions[cid])
+            self.ranked = ranked
+            self._rank_shared()
+
+    def set_champions(self, champions):
+        """champions: iterable de (champion_id, rol, activo)."""
+        with self._lock:
+            for champion in champions:
+                self._set_champion(*champion)
+            self._rank_shared()
+
+    def set_items(self, items):
+        """items: iterable de (item_id, nombre, activo)."""
+        with self._lock:
+            for item in items:
+                self._set_item(*item)
+            # Un ítem desactivado sale de todas las builds
+            self.ranked = {cid: self._rank_champion(row) for cid, row in self.champions.items()}
+            self._rank_shared()
+
+    def _set_champion(self, champion_id, rol, activo):
+        row = self.champions.get(champion_id)
+        if row is None:
+            row = self._grow_champions(champion_id)
+        self.roles[row] = rol
+        self.activos[row] = bool(activo)
+
+    def _set_item(self, item_id, nombre, activo):
+        col = self.items.get(item_id)
+        if col is None:
+            col = self._grow_items(item_id)
+        self.nombres[item_id] = nombre
+        self.items_activos[col] = bool(activo)
+
+    def _set_builds(self, builds):
+        for champion_id, item_id, porcentaje_uso in builds:
+            row, col = self.champions.get(champion_id), self.items.get(item_id)
+            if row is None or col is None:
+                # Build huérfana (SQLite no hace cumplir las claves foráneas): se ignora
+                continue
+            self.uso[row, col] = porcentaje_uso or 0.0
+
+    def _grow_champions(self, champion_id):
+        # Crece duplicando la capacidad (como draft.MatchupMatrix): O(1) amortizado
+        row = len(self.champions)
+        capacity = len(self.champion_ids)
+        if row == capacity:
+            grow = max(8, capacity)
+            self.champion_ids = np.concatenate([self.champion_ids, np.zeros(grow, dtype=np.int64)])
+            self.roles = np.concatenate([self.roles, np.empty(grow, dtype=object)])
+            self.activos = np.concatenate([self.activos, np.zeros(grow, dtype=bool)])
+            self.uso = np.pad(self.uso, ((0, grow), (0, 0)))
+
+        self.champions[champion_id] = row
+        self.champion_ids[row] = champion_id
+        self.roles[row] = ""
+        return row
+
+    def _grow_items(self, item_id):
+        col = len(self.items)
+        capacity = len(self.item_ids)
+        if col == capacity:
+            grow = max(8, capacity)
+            self.item_ids = np.concatenate([self.item_ids, np.zeros(grow, dtype=np.int64)])
+            self.items_activos = np.concatenate([self.items_activos, np.zeros(grow, dtype=bool)])
+            self.uso = np.pad(self.uso, ((0, 0), (0, grow)))
+
+        self.items[item_id] = col
+        self.item_ids[col] = item_id
+        return col
+
+    # ---------------- rankings ----------------
+
+    def _ordered(self, scores, cols):
+        # Desempate por item_id para que el orden sea estable entre recargas
+        order = np.lexsort((self.item_ids[cols], -scores[cols]))
+        return [(int(self.item_ids[cols[k]]), float(scores[cols[k]])) for k in order]
+
+    def _rank_champion(self, row):
+        uso = self.uso[row]
+        cols = np.flatnonzero((uso > 0) & self.items_activos)
+        return self._ordered(uso, cols)
+
+    def _rank_shared(self):
+        activos = self.activos
+        by_role = {}
+        for rol in set(self.roles[activos]):
+            media = self.uso[activos & (self.roles == rol)].mean(axis=0)
+            by_role[rol] = self._ordered(media, np.flatnonzero((media > 0) & self.items_activos))
+
+        # cooc[i, j] = campeones activos con i y j en la build
+        presentes = (self.uso[activos] > 0).astype(np.int32)
+        juntos = presentes.T @ presentes
+        np.fill_diagonal(juntos, 0)
+        juntos[:, ~self.items_activos] = 0
+
+        cooc = {}
+        for col in np.flatnonzero(self.items_activos & (juntos.sum(axis=1) > 0)):
+            fila = juntos[col]
+            cols = np.flatnonzero(fila)
+            if len(cols) > COOC_TOP_K:
+                cols = cols[np.argpartition(-fila[cols], COOC_TOP_K)[:COOC_TOP_K]]
+            cooc[int(self.item_ids[col])] = [(i, int(n)) for i, n in self._ordered(fila.astype(np.float64), cols)]
+
+        self.by_role = by_role
+        self.cooc = cooc
+
+    # ---------------- lecturas ----------------
+
+    def _named(self, pairs, field):
+        return [{"item_id": i, "nombre": self.nombres.get(i, ""), field: v} for i, v in pairs]
+
+    def recommend(self, champion_id: int, n: int = 6):
+        """Top-N de la build del campeón y de su rol, y con qué suele ir cada ítem. None si no existe."""
+        row = self.champions.get(champion_id)
+        if row is None:
+            return None
+        rol = self.roles[row]
+        build = self.ranked.get(champion_id, [])[:n]
+        return {
+            "champion_id": champion_id,
+            "rol": rol,
+            "build": self._named(build, "porcentaje_uso"),
+            "populares_rol": self._named(self.by_role.get(rol, [])[:n], "porcentaje_uso"),
+            "junto_a": {item_id: self._named(self.cooc.get(item_id, []), "campeones") for item_id, _ in build},
+        }
+
+
+index = BuildIndex()
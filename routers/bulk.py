@@ -0,0 +1,29 @@
+import io
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+import bulk
+from database import get_db
+
+router = APIRouter(prefix="/bulk", tags=["Bulk"])
+
+
+@router.post("/{entity}")
+def bulk_import(
+    entity: str,
+    archivo: UploadFile = File(...),
+    formato: str | None = None,
+    chunk_size: int = 1000,
+    db: Session = Depends(get_db)
+):
+    if entity not in bulk.ENTITIES:
+        raise HTTPException(404, f"Entidad desconocida: {entity}")
+
+    fmt = formato or bulk.detect_format(archivo.filename)
+    if fmt not in bulk.FORMATS:
+        raise HTTPException(400, f"Formato inválido: {fmt}")
+
+    # UploadFile ya está en un archivo temporal: se lee en streaming, fila a fila
+    stream = io.TextIOWrapper(archivo.file, encoding="utf-8", newline="")
+    return bulk.import_stream(db, entity, stream, fmt, max(chunk_size, 1))
@@ -1,26 +1,19 @@
-from fastapi import APIRouter, Depends, Request, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
-import crud, schemas, database
-from fastapi.templating import Jinja2Templates
+import crud, recommend, schemas
+from database import get_db
+from http_cache import Conditional
+from templating import templates
 
 router = APIRouter(
     prefix="/champion-items",
     tags=["Champion Items"]
 )
 
-templates = Jinja2Templates(directory="templates")
-
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 # lista items champ ============================================================
-@router.get("/{champion_id}", response_class=HTMLResponse)
+@router.get("/{champion_id}", response_class=HTMLResponse, dependencies=[Depends(Conditional("champions", "items", "builds"))])
 def get_items_for_champion(request: Request, champion_id: int, db: Session = Depends(get_db)):
     champion = crud.get_champion(db, champion_id)
     items = crud.get_items_for_champion(db, champion_id)
@@ -32,6 +25,17 @@ def get_items_for_champion(request: Request, champion_id: int, db: Session = Dep
     })
 
 
+# BUILD RECOMENDADA ============================================================
+# Sale del índice en memoria (recommend.index): no toca la base
+@router.get("/{champion_id}/recommended", response_model=schemas.BuildRecommendation,
+            dependencies=[Depends(Conditional("champions", "items", "builds"))])
+def recommended_build(champion_id: int, n: int = Query(6, ge=1, le=30)):
+    data = recommend.index.recommend(champion_id, n)
+    if data is None:
+        raise HTTPException(404, "Champion not found")
+    return data
+
+
 # AGREGAR ITEM ============================================================
 @router.get("/{champion_id}/add", response_class=HTMLResponse)
 def add_item_form(request: Request, champion_id: int, db: Session = Depends(get_db)):
@@ -54,5 +58,6 @@ def add_item_to_champion(
     porcentaje_uso: float = Form(0.0),
     db: Session = Depends(get_db)
 ):
-    crud.add_item_to_champion(db, champion_id, item_id, porcentaje_uso)
+    if crud.add_item_to_champion(db, champion_id, item_id, porcentaje_uso) is None:
+        raise HTTPException(404, "Champion or item not found")
     return RedirectResponse(url=f"/champion-items/{champion_id}", status_code=303)
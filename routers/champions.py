@@ -1,48 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from templating import templates
 from sqlalchemy.orm import Session
-import crud, schemas, database, models
+from sqlalchemy.ext.asyncio import AsyncSession
+import crud, crud_async, schemas, database, counters, history, pagination, leaderboard
+from database import get_db, get_async_db
+from http_cache import Conditional, cached_page, cached_page_async
 from typing import Optional
 
 router = APIRouter(prefix="/champions", tags=["Champions"])
 
-templates = Jinja2Templates(directory="templates")
+PAGE_SIZE = 100
 
+# ETag / 304 para las lecturas que solo dependen del catálogo de campeones
+CACHE_CHAMPIONS = Conditional("champions")
 
+# El ranking (champion_leaderboard) cambia con campeones, ítems, builds y su refresco periódico
+LEADERBOARD = ["champions", "items", "builds", "leaderboard"]
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Clave del cursor de cada listado (ver pagination.py)
+def by_id(c):
+    return (c.id,)
+
+def by_puesto(rol):
+    return lambda e: (e.puesto_rol if rol else e.puesto,)
 
 
 # ============================
 
 
-@router.get("/list", response_class=HTMLResponse)
-def list_champions_page(request: Request, rol: Optional[str] = None, db: Session = Depends(get_db)):
-    champions = [c for c in crud.list_champions_by_winrate(db, rol) if c.activo]
+# Las lecturas más usadas tienen versión async (DB_ASYNC=1) y versión sync.
 
+def render_champions_list(request: Request, champions, rol: Optional[str]):
+    cursor = pagination.next_cursor(champions, PAGE_SIZE, by_puesto(rol))
     return templates.TemplateResponse("champion/champions_list.html", {
         "request": request,
         "champions": champions,
         "selected_rol": rol,
-        "roles": ["Top", "JG", "Mid", "Adc", "Sup"]
+        "roles": ["Top", "JG", "Mid", "Adc", "Sup"],
+        "first_url": pagination.page_url(request, None) if "cursor" in request.query_params else None,
+        "next_url": pagination.page_url(request, cursor) if cursor else None
     })
 
 
-@router.get("/deleted", response_class=HTMLResponse)
-def list_deleted_champions_page(request: Request, db: Session = Depends(get_db)):
+if database.DB_ASYNC:
+    @router.get("/list", response_class=HTMLResponse, dependencies=[Depends(Conditional(*LEADERBOARD))])
+    async def list_champions_page(request: Request, rol: Optional[str] = None, cursor: Optional[str] = None,
+                                  db: AsyncSession = Depends(get_async_db)):
+        async def render():
+            after = pagination.decode_cursor(cursor)
+            champions = await crud_async.list_leaderboard(db, rol, PAGE_SIZE, after)
+            return render_champions_list(request, champions, rol)
 
-    deleted = [c for c in crud.list_champions(db, include_inactive=True) if not c.activo]
+        return await cached_page_async(request, LEADERBOARD, render)
+else:
+    @router.get("/list", response_class=HTMLResponse, dependencies=[Depends(Conditional(*LEADERBOARD))])
+    def list_champions_page(request: Request, rol: Optional[str] = None, cursor: Optional[str] = None,
+                            db: Session = Depends(get_db)):
+        def render():
+            after = pagination.decode_cursor(cursor)
+            champions = leaderboard.list_page(db, rol, PAGE_SIZE, after)
+            return render_champions_list(request, champions, rol)
 
-    return templates.TemplateResponse("champion/champions_deleted.html", {
-        "request": request,
-        "champions": deleted
-    })
+        return cached_page(request, LEADERBOARD, render)
+
+
+@router.get("/deleted", response_class=HTMLResponse, dependencies=[Depends(CACHE_CHAMPIONS)])
+def list_deleted_champions_page(request: Request, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+
+    def render():
+        deleted = crud.list_deleted_champions(db, limit=PAGE_SIZE, after=pagination.decode_cursor(cursor))
+        next_cursor = pagination.next_cursor(deleted, PAGE_SIZE, by_id)
+
+        return templates.TemplateResponse("champion/champions_deleted.html", {
+            "request": request,
+            "champions": deleted,
+            "first_url": pagination.page_url(request, None) if cursor else None,
+            "next_url": pagination.page_url(request, next_cursor) if next_cursor else None
+        })
+
+    return cached_page(request, ["champions"], render)
 
 
 @router.get("/new", response_class=HTMLResponse)
@@ -60,38 +97,26 @@ def submit_new_champion(
     activo: Optional[str] = Form("on"),
     db: Session = Depends(get_db)
 ):
-    new_champ = models.Champion(
+    crud.create_champion(db, schemas.ChampionCreate(
         nombre=nombre,
         rol=rol,
         tasa_victoria=tasa_victoria,
         tasa_seleccion=tasa_seleccion,
         tasa_baneo=tasa_baneo,
         activo=activo == "on"
-    )
-
-    db.add(new_champ)
-    db.commit()
-    return RedirectResponse("/champions/list", status_code=302)
+    ))
+    return back_to_list()
 
 
-@router.get("/{champion_id}/view", response_class=HTMLResponse)
+@router.get("/{champion_id}/view", response_class=HTMLResponse, dependencies=[Depends(Conditional("champions", "items", "builds", "cvc"))])
 def view_champion(champion_id: int, request: Request, db: Session = Depends(get_db)):
 
-    champion = crud.get_champion(db, champion_id) or raise_404()
-
-
-    items_con_porcentaje = [
-        (ci, item)
-        for item in champion.items
-        for ci in champion.champion_items
-        if ci.item_id == item.id
-    ]
+    detail = crud.get_champion_detail(db, champion_id) or raise_404()
 
     return templates.TemplateResponse("champion/champion_detail.html", {
         "request": request,
-        "champion": champion,
         "all_items": crud.list_items(db),
-        "items_con_porcentaje": items_con_porcentaje
+        **detail
     })
 
 
@@ -120,15 +145,15 @@ def submit_edit_champion(
     if rol not in ["Top", "JG", "Mid", "Adc", "Sup"]:
         raise HTTPException(400, f"Rol inválido: {rol}")
 
-    champ.nombre = nombre
-    champ.rol = rol
-    champ.tasa_victoria = tasa_victoria
-    champ.tasa_seleccion = tasa_seleccion
-    champ.tasa_baneo = tasa_baneo
-    champ.activo = activo == "on"
-
-    db.commit()
-    return RedirectResponse("/champions/list", status_code=302)
+    crud.update_champion(db, champ, schemas.ChampionUpdate(
+        nombre=nombre,
+        rol=rol,
+        tasa_victoria=tasa_victoria,
+        tasa_seleccion=tasa_seleccion,
+        tasa_baneo=tasa_baneo,
+        activo=activo == "on"
+    ))
+    return back_to_list()
 
 
 # ============================
@@ -140,64 +165,120 @@ def add_item_to_champion(
     porcentaje_uso: float = Form(0.0),
     db: Session = Depends(get_db)
 ):
-    champion = crud.get_champion(db, champion_id) or raise_404()
-
-    existing = next((ci for ci in champion.champion_items if ci.item_id == item_id), None)
-
-    if existing:
-        existing.porcentaje_uso = porcentaje_uso
-    else:
-        db.add(models.ChampionItem(
-            champion_id=champion_id,
-            item_id=item_id,
-            porcentaje_uso=porcentaje_uso
-        ))
-
-    db.commit()
+    crud.add_item_to_champion(db, champion_id, item_id, porcentaje_uso) or raise_404()
     return RedirectResponse(f"/champions/{champion_id}/view", status_code=302)
 
 
 @router.post("/{champion_id}/delete")
 def delete_champion(champion_id: int, db: Session = Depends(get_db)):
-    champ = crud.get_champion(db, champion_id) or raise_404()
-
-    champ.activo = False
-    db.commit()
+    crud.soft_delete_champion(db, champion_id) or raise_404()
 
-    return RedirectResponse("/champions/list", status_code=303)
+    return back_to_list(status_code=303)
 
 
 @router.post("/{champion_id}/activate")
 def activate_champion(champion_id: int, db: Session = Depends(get_db)):
     champ = crud.get_champion(db, champion_id) or raise_404()
+    crud.update_champion(db, champ, schemas.ChampionUpdate(activo=True))
 
-    champ.activo = True
-    db.commit()
-
-    return RedirectResponse("/champions/deleted", status_code=303)
+    return back_to_list("/champions/deleted", status_code=303)
 
 
 # ============================
 
 
-@router.get("/", response_model=list[schemas.Champion])
-def list_champions(skip: int = 0, limit: int = 100, include_inactive: bool = False, db: Session = Depends(get_db)):
-    return crud.list_champions(db, skip, limit, include_inactive)
+# Paginación: ?limit=N&cursor=... y el cursor siguiente llega en X-Next-Cursor / Link.
+# skip sigue funcionando pero está deprecado (cuesta más cuanto más profunda es la página).
+if database.DB_ASYNC:
+    @router.get("/", response_model=list[schemas.Champion], dependencies=[Depends(CACHE_CHAMPIONS)])
+    async def list_champions(
+        request: Request,
+        response: Response,
+        limit: int = Query(100, ge=1, le=pagination.MAX_LIMIT),
+        cursor: Optional[str] = None,
+        skip: int = Query(0, ge=0, deprecated=True),
+        include_inactive: bool = False,
+        db: AsyncSession = Depends(get_async_db)
+    ):
+        after = pagination.decode_cursor(cursor)
+        champions = await crud_async.list_champions(db, skip, limit, include_inactive, after=after)
+        pagination.link_next(request, response, pagination.next_cursor(champions, limit, by_id))
+        return champions
+else:
+    @router.get("/", response_model=list[schemas.Champion], dependencies=[Depends(CACHE_CHAMPIONS)])
+    def list_champions(
+        request: Request,
+        response: Response,
+        limit: int = Query(100, ge=1, le=pagination.MAX_LIMIT),
+        cursor: Optional[str] = None,
+        skip: int = Query(0, ge=0, deprecated=True),
+        include_inactive: bool = False,
+        db: Session = Depends(get_db)
+    ):
+        after = pagination.decode_cursor(cursor)
+        champions = crud.list_champions(db, skip, limit, include_inactive, after=after)
+        pagination.link_next(request, response, pagination.next_cursor(champions, limit, by_id))
+        return champions
+
+
+@router.get("/api/deleted", response_model=list[schemas.Champion], dependencies=[Depends(CACHE_CHAMPIONS)])
+def list_deleted_champions_api(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=pagination.MAX_LIMIT),
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    db: Session = Depends(get_db)
+):
+    deleted = crud.list_deleted_champions(db, skip, limit, pagination.decode_cursor(cursor))
+    pagination.link_next(request, response, pagination.next_cursor(deleted, limit, by_id))
+    return deleted
+
+
+if database.DB_ASYNC:
+    @router.get("/{champion_id}", response_model=schemas.Champion, dependencies=[Depends(Conditional(entity="champions", param="champion_id"))])
+    async def get_champion(champion_id: int, db: AsyncSession = Depends(get_async_db)):
+        return await crud_async.get_champion(db, champion_id) or raise_404()
+else:
+    @router.get("/{champion_id}", response_model=schemas.Champion, dependencies=[Depends(Conditional(entity="champions", param="champion_id"))])
+    def get_champion(champion_id: int, db: Session = Depends(get_db)):
+        return crud.get_champion(db, champion_id) or raise_404()
 
 
-@router.get("/api/deleted", response_model=list[schemas.Champion])
-def list_deleted_champions_api(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return [c for c in crud.list_champions(db, skip, limit, True) if not c.activo]
+@router.get("/{champion_id}/counters", response_model=schemas.ChampionCounters, dependencies=[Depends(Conditional("champions", "cvc"))])
+def get_champion_counters(champion_id: int, rol: Optional[str] = None, k: int = Query(5, ge=1, le=counters.TOP_K), db: Session = Depends(get_db)):
+    crud.get_champion(db, champion_id) or raise_404()
+    data = counters.get_counters(db, champion_id, rol or "", k)
 
+    def entries(rows):
+        return [{"oponente_id": r.oponente_id, "nombre": r.oponente.nombre, "winrate": r.winrate} for r in rows]
 
-@router.get("/{champion_id}", response_model=schemas.Champion)
-def get_champion(champion_id: int, db: Session = Depends(get_db)):
-    return crud.get_champion(db, champion_id) or raise_404()
+    return {
+        "champion_id": champion_id,
+        "rol": rol,
+        "counters": entries(data["counters"]),
+        "victimas": entries(data["victimas"]),
+    }
 
 
-@router.get("/by-name/{name}", response_model=schemas.Champion)
-def get_champion_by_name(name: str, db: Session = Depends(get_db)):
-    return crud.get_champion_by_name(db, name) or raise_404()
+@router.get("/{champion_id}/trend", response_model=schemas.ChampionTrend,
+            dependencies=[Depends(Conditional(entity="champions", param="champion_id"))])
+def get_champion_trend(champion_id: int, ultimos: Optional[int] = Query(None, ge=1), db: Session = Depends(get_db)):
+    # Una fila de champion_trends, sin recorrer el histórico
+    data = history.get_trend(db, champion_id, ultimos)
+    if data is None:
+        raise_404()
+    return {"champion_id": champion_id, **data}
+
+
+if database.DB_ASYNC:
+    @router.get("/by-name/{name}", response_model=schemas.Champion, dependencies=[Depends(CACHE_CHAMPIONS)])
+    async def get_champion_by_name(name: str, db: AsyncSession = Depends(get_async_db)):
+        return await crud_async.get_champion_by_name(db, name) or raise_404()
+else:
+    @router.get("/by-name/{name}", response_model=schemas.Champion, dependencies=[Depends(CACHE_CHAMPIONS)])
+    def get_champion_by_name(name: str, db: Session = Depends(get_db)):
+        return crud.get_champion_by_name(db, name) or raise_404()
 
 
 @router.post("/", response_model=schemas.Champion)
@@ -207,7 +288,8 @@ def create_champion(champion: schemas.ChampionCreate, db: Session = Depends(get_
 
 @router.put("/{champion_id}", response_model=schemas.Champion)
 def update_champion(champion_id: int, champion: schemas.ChampionUpdate, db: Session = Depends(get_db)):
-    return crud.update_champion(db, champion_id, champion) or raise_404()
+    db_champion = crud.get_champion(db, champion_id) or raise_404()
+    return crud.update_champion(db, db_champion, champion)
 
 
 # ============================
@@ -217,6 +299,13 @@ def raise_404():
     raise HTTPException(404, "Champion not found")
 
 
+def back_to_list(url: str = "/champions/list", status_code: int = 302):
+    # El ranking se reconstruye en segundo plano: tras un formulario se hace
+    # ya, para que la lista a la que se vuelve muestre el cambio
+    leaderboard.refresh_if_stale()
+    return RedirectResponse(url, status_code=status_code)
+
+
 @router.get("/", include_in_schema=False)
 def redirect_to_list():
     return RedirectResponse("/champions/list", status_code=302)
@@ -1,21 +1,41 @@
-from fastapi import APIRouter, Request, Depends, Form
+from fastapi import APIRouter, HTTPException, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
 from database import get_db
-import crud
-from fastapi.templating import Jinja2Templates
+from http_cache import Conditional, cached_page
+import crud, pagination
+from templating import templates
+from typing import Optional
 
 router = APIRouter(prefix="/cvc", tags=["CVC"])
-templates = Jinja2Templates(directory="templates")
 
-@router.get("/", response_class=HTMLResponse)
-def list_cvc(request: Request, db: Session = Depends(get_db)):
-    data = crud.list_cvc(db)
-    return templates.TemplateResponse("cvc/cvc_list.html", {"request": request, "cvc_list": data})
+PAGE_SIZE = 50
+
+@router.get("/", response_class=HTMLResponse, dependencies=[Depends(Conditional("cvc", "champions"))])
+def list_cvc(request: Request, champion_id: Optional[str] = None, cursor: Optional[str] = None,
+             db: Session = Depends(get_db)):
+    # El <select> envía champion_id="" cuando se elige "Todos"
+    champion_id = int(champion_id) if champion_id and champion_id.isdigit() else None
+
+    def render():
+        data = crud.list_cvc(db, champion_id, limit=PAGE_SIZE, after=pagination.decode_cursor(cursor))
+        next_cursor = pagination.next_cursor(data, PAGE_SIZE, lambda c: (c.id,))
+
+        return templates.TemplateResponse("cvc/cvc_list.html", {
+            "request": request,
+            "cvc_list": data,
+            "champions": crud.list_champion_names(db),
+            "selected_champion": champion_id,
+            "total": crud.count_cvc(db, champion_id),
+            "first_url": pagination.page_url(request, None) if cursor else None,
+            "next_url": pagination.page_url(request, next_cursor) if next_cursor else None
+        })
+
+    return cached_page(request, ["cvc", "champions"], render)
 
 @router.get("/new", response_class=HTMLResponse)
 def create_cvc_form(request: Request, db: Session = Depends(get_db)):
-    champions = crud.list_champions(db)
+    champions = crud.list_champion_names(db)
     return templates.TemplateResponse("cvc/cvc_create.html", {
         "request": request,
         "champions": champions
@@ -29,6 +49,9 @@ def create_cvc(
     oponente_id: int = Form(...),
     winrate: float = Form(...)
 ):
-    crud.create_cvc(db, champion_id, oponente_id, winrate)
+    if champion_id == oponente_id:
+        raise HTTPException(400, "A champion can't be matched against itself")
+    if crud.create_cvc(db, champion_id, oponente_id, winrate) is None:
+        raise HTTPException(404, "Champion not found")
     return RedirectResponse(url="/cvc", status_code=303)
 
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Query
+from typing import List, Optional
+
+import draft, schemas
+
+router = APIRouter(prefix="/draft", tags=["Draft"])
+
+
+# Nada de esto toca la base: se calcula sobre la matriz en memoria (draft.matrix)
+
+@router.post("/score", response_model=schemas.DraftScore)
+def score_draft(data: schemas.DraftRequest):
+    return draft.matrix.score_draft(data.azul, data.rojo)
+
+
+@router.get("/picks", response_model=list[schemas.PickSuggestion])
+def suggest_picks(
+    enemigos: List[int] = Query(..., max_length=5),
+    rol: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=50)
+):
+    return draft.matrix.rank_picks(enemigos, rol, limit)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+import export
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+@router.get("/{entity}")
+def export_entity(
+    entity: str,
+    formato: str = "csv",
+    batch_size: int = Query(export.BATCH_SIZE, ge=100, le=50000)
+):
+    if entity not in export.ENTITIES:
+        raise HTTPException(404, f"Entidad desconocida: {entity}")
+    if formato not in export.WRITERS:
+        raise HTTPException(400, f"Formato inválido: {formato}")
+    if formato == "parquet" and not export.parquet_available():
+        raise HTTPException(400, "Parquet requiere pyarrow (pip install pyarrow)")
+
+    # Sin Depends(get_db): el generador abre su propia sesión, que tiene que
+    # seguir viva mientras se envía la respuesta
+    return StreamingResponse(
+        export.WRITERS[formato](entity, batch_size),
+        media_type=export.MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{formato}"'}
+    )
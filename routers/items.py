@@ -1,37 +1,52 @@
 from fastapi import APIRouter, Depends, Request, Form
-from fastapi.templating import Jinja2Templates
+from typing import Optional
+from templating import templates
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
-import crud, schemas, database
+from sqlalchemy.ext.asyncio import AsyncSession
+import crud, crud_async, schemas, database, pagination
+from database import get_db, get_async_db
+from http_cache import Conditional, cached_page, cached_page_async
 
 router = APIRouter(
     prefix="/items",
     tags=["Items"]
 )
 
-templates = Jinja2Templates(directory="templates")
+PAGE_SIZE = 100
 
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def render_items_list(request: Request, items):
+    cursor = pagination.next_cursor(items, PAGE_SIZE, lambda i: (i.id,))
+    return templates.TemplateResponse("items/items_list.html", {
+        "request": request,
+        "items": items,
+        "first_url": pagination.page_url(request, None) if "cursor" in request.query_params else None,
+        "next_url": pagination.page_url(request, cursor) if cursor else None
+    })
 
 
 # VER
-@router.get("/", response_class=HTMLResponse)
-def list_items_page(request: Request, db: Session = Depends(get_db)):
-    items = crud.list_items(db)
-    return templates.TemplateResponse(
-        "items/items_list.html",
-        {"request": request, "items": items}
-    )
+if database.DB_ASYNC:
+    @router.get("/", response_class=HTMLResponse, dependencies=[Depends(Conditional("items"))])
+    async def list_items_page(request: Request, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+        async def render():
+            items = await crud_async.list_items(db, limit=PAGE_SIZE, after=pagination.decode_cursor(cursor))
+            return render_items_list(request, items)
+
+        return await cached_page_async(request, ["items"], render)
+else:
+    @router.get("/", response_class=HTMLResponse, dependencies=[Depends(Conditional("items"))])
+    def list_items_page(request: Request, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+        def render():
+            items = crud.list_items(db, limit=PAGE_SIZE, after=pagination.decode_cursor(cursor))
+            return render_items_list(request, items)
+
+        return cached_page(request, ["items"], render)
 
 
 # VER
-@router.get("/{item_id}/view", response_class=HTMLResponse)
+@router.get("/{item_id}/view", response_class=HTMLResponse, dependencies=[Depends(Conditional(entity="items", param="item_id"))])
 def view_item_page(item_id: int, request: Request, db: Session = Depends(get_db)):
     item = crud.get_item(db, item_id)
     if not item:
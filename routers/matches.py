@@ -0,0 +1,27 @@
+import io
+from typing import List
+
+from fastapi import APIRouter, Depends, File, UploadFile
+from sqlalchemy.orm import Session
+
+import matches, schemas
+from database import get_db
+
+router = APIRouter(prefix="/matches", tags=["Matches"])
+
+
+@router.post("/", response_model=schemas.MatchIngestReport)
+def ingest_matches(records: List[dict], batch_size: int = matches.BATCH_SIZE, db: Session = Depends(get_db)):
+    # dicts y no List[MatchRecord]: una partida inválida se cuenta como rechazada en vez de tirar el lote
+    return matches.ingest(db, records, max(batch_size, 1))
+
+
+@router.post("/jsonl", response_model=schemas.MatchIngestReport)
+def ingest_matches_file(
+    archivo: UploadFile = File(...),
+    batch_size: int = matches.BATCH_SIZE,
+    db: Session = Depends(get_db)
+):
+    # Igual que /bulk: el archivo ya está en disco y se lee línea a línea
+    stream = io.TextIOWrapper(archivo.file, encoding="utf-8")
+    return matches.ingest(db, (line for line in stream if line.strip()), max(batch_size, 1))
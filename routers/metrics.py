@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from anyio import to_thread
+
+import database
+from cache import catalog_cache, page_cache
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("/cache")
+def cache_metrics():
+    return {"catalog": catalog_cache.stats(), "pages": page_cache.stats()}
+
+
+@router.get("/pool")
+async def pool_metrics():
+    # async a propósito: así la consulta responde aunque el threadpool esté saturado
+    limiter = to_thread.current_default_thread_limiter()
+    return {
+        **database.pool_status(),
+        "threadpool": {"total": limiter.total_tokens, "borrowed": limiter.borrowed_tokens},
+    }
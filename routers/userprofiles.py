@@ -1,28 +1,19 @@
-from fastapi import APIRouter, Form, File, UploadFile, Depends, Request
+from fastapi import APIRouter, BackgroundTasks, Form, File, UploadFile, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-import os
 from typing import List
 
-import database, crud, models, schemas
-from fastapi.templating import Jinja2Templates
+import crud, schemas, uploads
+from database import get_db
+from templating import templates
 
-templates = Jinja2Templates(directory="templates")
 router = APIRouter(prefix="/userprofiles", tags=["UserProfiles"])
 
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-
 @router.get("/new")
 def new_userprofile_form(request: Request, db: Session = Depends(get_db)):
-    all_champions = db.query(models.Champion).all()
+    all_champions = crud.list_champion_names(db)
     return templates.TemplateResponse(
         "profile/userprofile_create.html",
         {"request": request, "all_champions": all_champions}
@@ -31,8 +22,9 @@ def new_userprofile_form(request: Request, db: Session = Depends(get_db)):
 
 
 @router.post("/new")
-def submit_new_userprofile(
+async def submit_new_userprofile(
     request: Request,
+    background_tasks: BackgroundTasks,
     nombre_perfil: str = Form(...),
     nombre_cuenta: str = Form(...),
     region: str = Form(None),
@@ -40,39 +32,30 @@ def submit_new_userprofile(
     foto: UploadFile = File(None),
     db: Session = Depends(get_db)
 ):
-    filename = None
-    if foto:
-        os.makedirs("static/uploads", exist_ok=True)
-        filename = f"static/uploads/{foto.filename}"
-        with open(filename, "wb") as f:
-            f.write(foto.file.read())
+    # async: la copia de la foto no ocupa un hilo; la parte de base de datos sí
+    filename = await uploads.save_upload(foto)
+    if filename:
+        background_tasks.add_task(uploads.make_thumbnail, filename)
 
     profile_data = schemas.UserProfileCreate(
         nombre_perfil=nombre_perfil,
         nombre_cuenta=nombre_cuenta,
         region=region,
-        foto=filename
+        foto=filename,
+        campeones_favoritos_ids=campeones_favoritos_ids
     )
 
-    db_profile = crud.create_userprofile(db, profile_data)
-
-    if campeones_favoritos_ids:
-        champions = db.query(models.Champion).filter(
-            models.Champion.id.in_(campeones_favoritos_ids)
-        ).all()
-        db_profile.campeones_favoritos = champions
-        db.commit()
-        db.refresh(db_profile)
-
+    # Perfil y favoritos en una sola transacción
+    db_profile = await run_in_threadpool(crud.create_userprofile, db, profile_data)
     return RedirectResponse(url=f"/userprofiles/view/{db_profile.id}", status_code=302)
 
 
 @router.get("/view/{profile_id}")
 def view_userprofile(profile_id: int, request: Request, db: Session = Depends(get_db)):
-    profile = db.query(models.UserProfile).filter(models.UserProfile.id == profile_id).first()
+    profile = crud.get_userprofile_view(db, profile_id)
     if not profile:
         return RedirectResponse("/userprofiles/new")
     return templates.TemplateResponse(
         "profile/view.html",
-        {"request": request, "profile": profile}
+        {"request": request, "profile": profile, "foto": uploads.display_path(profile.foto)}
     )
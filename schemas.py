@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List
 
 # Perfil campeón===========================================================
 
@@ -67,6 +67,9 @@ class ChampionUpdate(BaseModel):
 
 class Champion(ChampionBase):
     id: int
+    muestras: int = 0
+    baneos: int = 0
+    favoritos_count: int = 0
 
     class Config:
         from_attributes = True
@@ -85,11 +88,60 @@ class CVCCreate(CVCBase):
 
 class CVC(CVCBase):
     id: int
+    muestras: int = 0
 
     class Config:
         orm_mode = True
 
 
+class CounterEntry(BaseModel):
+    oponente_id: int
+    nombre: str
+    winrate: float
+
+class ChampionCounters(BaseModel):
+    champion_id: int
+    rol: Optional[str] = None
+    counters: List[CounterEntry]
+    victimas: List[CounterEntry]
+
+
+# Series por parche (ver history.py); delta_* es None en el primer parche
+class ChampionTrend(BaseModel):
+    champion_id: int
+    parches: List[str]
+    tasa_victoria: List[float]
+    tasa_seleccion: List[float]
+    tasa_baneo: List[float]
+    delta_tasa_victoria: List[Optional[float]]
+    delta_tasa_seleccion: List[Optional[float]]
+    delta_tasa_baneo: List[Optional[float]]
+    media_tasa_victoria: List[float]
+    media_tasa_seleccion: List[float]
+    media_tasa_baneo: List[float]
+
+
+# draft ============================================================
+
+
+class DraftRequest(BaseModel):
+    azul: List[int] = Field(..., max_length=5)
+    rojo: List[int] = Field(..., max_length=5)
+
+class DraftScore(BaseModel):
+    azul: float
+    rojo: float
+    pares_conocidos: int
+    pares_totales: int
+
+class PickSuggestion(BaseModel):
+    champion_id: int
+    nombre: str
+    rol: str
+    winrate: float
+    pares_conocidos: int
+
+
 # champion item============================================================
 
 
@@ -103,11 +155,30 @@ class ChampionItemCreate(ChampionItemBase):
 
 class ChampionItem(ChampionItemBase):
     id: int
+    muestras: int = 0
 
     class Config:
         orm_mode = True
 
 
+class BuildItem(BaseModel):
+    item_id: int
+    nombre: str
+    porcentaje_uso: float
+
+class BuildPartner(BaseModel):
+    item_id: int
+    nombre: str
+    campeones: int
+
+class BuildRecommendation(BaseModel):
+    champion_id: int
+    rol: str
+    build: List[BuildItem]
+    populares_rol: List[BuildItem]
+    junto_a: Dict[int, List[BuildPartner]]
+
+
 # profile ============================================================
 
 
@@ -126,3 +197,27 @@ class UserProfile(UserProfileBase):
 
     class Config:
         orm_mode = True
+
+
+# partidas ============================================================
+
+
+class MatchParticipant(BaseModel):
+    champion_id: int
+    items: List[int] = []
+
+class MatchRecord(BaseModel):
+    azul: List[MatchParticipant] = Field(..., min_length=1, max_length=5)
+    rojo: List[MatchParticipant] = Field(..., min_length=1, max_length=5)
+    ganador: Literal["azul", "rojo"]
+    baneos: List[int] = Field([], max_length=10)
+
+class MatchIngestReport(BaseModel):
+    recibidas: int
+    ingeridas: int
+    rechazadas: int
+    partidas_totales: int
+    campeones: int
+    builds: int
+    matchups: int
+    seconds: float
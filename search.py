@@ -0,0 +1,284 @@
+import os
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from sqlalchemy import func, or_, text
+from sqlalchemy.orm import Session
+
+import models
+
+# Qué se indexa: namespace -> modelo con columnas id / nombre
+CATALOGOS = {
+    "champions": models.Champion,
+    "items": models.Item,
+}
+
+
+def normalize(value: str) -> str:
+    """Minúsculas y sin tildes: "Ñandú Épico" -> "nandu epico"."""
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(value.lower().split())
+
+
+def trigrams(value: str) -> set:
+    # Mismo relleno que pg_trgm: dos espacios al inicio y uno al final de cada palabra
+    grams = set()
+    for word in value.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+# ============================================================
+# Backend en memoria (funciona con cualquier base, incluido SQLite)
+# ============================================================
+
+class NgramIndex:
+    """Índice invertido de trigramas sobre los nombres del catálogo."""
+
+    min_similarity = 0.3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs = {}                      # (namespace, id) -> (nombre normalizado, trigramas)
+        self._postings = defaultdict(set)    # trigrama -> {(namespace, id)}
+
+    def build(self, db: Session):
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            for namespace, model in CATALOGOS.items():
+                for doc_id, nombre in db.query(model.id, model.nombre):
+                    self._add((namespace, doc_id), nombre)
+
+    def index(self, namespace: str, doc_id: int, nombre: str):
+        with self._lock:
+            self._remove((namespace, doc_id))
+            self._add((namespace, doc_id), nombre)
+
+    def remove(self, namespace: str, doc_id: int):
+        with self._lock:
+            self._remove((namespace, doc_id))
+
+    def _add(self, key, nombre):
+        norm = normalize(nombre)
+        grams = trigrams(norm)
+        self._docs[key] = (norm, grams)
+        for gram in grams:
+            self._postings[gram].add(key)
+
+    def _remove(self, key):
+        doc = self._docs.pop(key, None)
+        if doc:
+            for gram in doc[1]:
+                self._postings[gram].discard(key)
+
+    def search(self, db: Session, query: str, limit: int = 20) -> dict:
+        norm = normalize(query)
+        results = {namespace: [] for namespace in CATALOGOS}
+        if not norm:
+            return results
+
+        query_grams = trigrams(norm)
+
+        with self._lock:
+            if len(norm) < 3:
+                # Con una o dos letras casi no hay trigramas útiles: se recorre todo
+                candidates = self._docs.keys()
+            else:
+                candidates = set()
+                for gram in query_grams:
+                    candidates |= self._postings.get(gram, set())
+
+            scored = []
+            for key in candidates:
+                nombre, grams = self._docs[key]
+                shared = len(query_grams & grams)
+                similarity = shared / len(query_grams | grams)
+                contains = norm in nombre
+                if not contains and similarity < self.min_similarity:
+                    continue
+                # Primero coincidencia exacta, luego prefijo, luego substring, luego parecido
+                rank = (nombre != norm, not nombre.startswith(norm), not contains, -similarity, nombre)
+                scored.append((rank, key))
+
+        scored.sort()
+        for _, (namespace, doc_id) in scored:
+            if len(results[namespace]) < limit:
+                results[namespace].append(doc_id)
+        return results
+
+
+# ============================================================
+# Backend Postgres: pg_trgm + unaccent con índices GIN
+# ============================================================
+
+class PostgresTrigramSearch:
+    """Delegar la búsqueda a Postgres; el índice lo mantiene la propia base."""
+
+    def build(self, db: Session):
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+        # unaccent() no es IMMUTABLE y no se puede usar en un índice: se envuelve
+        db.execute(text(
+            "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text "
+            "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS "
+            "$$ SELECT public.unaccent('public.unaccent', $1) $$"
+        ))
+        for namespace, model in CATALOGOS.items():
+            table = model.__tablename__
+            db.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_nombre_trgm ON {table} "
+                f"USING gin (lower(f_unaccent(nombre)) gin_trgm_ops)"
+            ))
+        db.commit()
+
+    def index(self, namespace: str, doc_id: int, nombre: str):
+        pass
+
+    def remove(self, namespace: str, doc_id: int):
+        pass
+
+    def search(self, db: Session, query: str, limit: int = 20) -> dict:
+        norm = normalize(query)
+        results = {namespace: [] for namespace in CATALOGOS}
+        if not norm:
+            return results
+
+        for namespace, model in CATALOGOS.items():
+            col = func.lower(func.f_unaccent(model.nombre))
+            rows = (
+                db.query(model.id)
+                .filter(or_(col.op("%")(norm), col.contains(norm, autoescape=True)))
+                .order_by(
+                    col.startswith(norm, autoescape=True).desc(),
+                    func.similarity(col, norm).desc(),
+                    model.nombre
+                )
+                .limit(limit)
+                .all()
+            )
+            results[namespace] = [r.id for r in rows]
+        return results
+
+
+# ============================================================
+# Autocompletado por prefijo (siempre en memoria)
+# ============================================================
+
+class PrefixSuggester:
+    """Array ordenado de (prefijo normalizado, ...) recorrido con bisect.
+
+    Cada nombre entra una vez por palabra ("Filo Infinito" también se
+    encuentra escribiendo "inf"), así una búsqueda es O(log n + N).
+    """
+
+    URLS = {
+        "champions": "/champions/{}/view",
+        "items": "/items/{}/view",
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []      # [(texto normalizado, nombre, namespace, id)] ordenado
+        self._by_doc = {}       # (namespace, id) -> entradas de ese documento
+
+    def build(self, db: Session):
+        entries, by_doc = [], {}
+        for namespace, model in CATALOGOS.items():
+            for doc_id, nombre in db.query(model.id, model.nombre):
+                by_doc[(namespace, doc_id)] = self._entries_for(namespace, doc_id, nombre)
+                entries.extend(by_doc[(namespace, doc_id)])
+        entries.sort()
+        with self._lock:
+            self._entries, self._by_doc = entries, by_doc
+
+    def index(self, namespace: str, doc_id: int, nombre: str):
+        with self._lock:
+            self._remove((namespace, doc_id))
+            self._by_doc[(namespace, doc_id)] = self._entries_for(namespace, doc_id, nombre)
+            for entry in self._by_doc[(namespace, doc_id)]:
+                insort(self._entries, entry)
+
+    def remove(self, namespace: str, doc_id: int):
+        with self._lock:
+            self._remove((namespace, doc_id))
+
+    def _entries_for(self, namespace, doc_id, nombre):
+        words = normalize(nombre).split()
+        return [(" ".join(words[i:]), nombre, namespace, doc_id) for i in range(len(words))]
+
+    def _remove(self, key):
+        for entry in self._by_doc.pop(key, []):
+            pos = bisect_left(self._entries, entry)
+            if pos < len(self._entries) and self._entries[pos] == entry:
+                del self._entries[pos]
+
+    def suggest(self, prefix: str, limit: int = 8) -> list:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        results, seen = [], set()
+        with self._lock:
+            pos = bisect_left(self._entries, (prefix,))
+            while pos < len(self._entries) and len(results) < limit:
+                texto, nombre, namespace, doc_id = self._entries[pos]
+                if not texto.startswith(prefix):
+                    break
+                if (namespace, doc_id) not in seen:
+                    seen.add((namespace, doc_id))
+                    results.append({
+                        "nombre": nombre,
+                        "tipo": namespace,
+                        "url": self.URLS[namespace].format(doc_id),
+                    })
+                pos += 1
+        return results
+
+
+# ============================================================
+# Selección del backend
+# ============================================================
+
+backend = NgramIndex()
+suggester = PrefixSuggester()
+
+
+def index(namespace: str, doc_id: int, nombre: str):
+    """Llamado desde crud cada vez que se crea o renombra un campeón / ítem."""
+    backend.index(namespace, doc_id, nombre)
+    suggester.index(namespace, doc_id, nombre)
+
+
+def init(db: Session):
+    """Construye el backend configurado en SEARCH_BACKEND (auto | memory | postgres)."""
+    global backend
+
+    suggester.build(db)
+
+    choice = os.getenv("SEARCH_BACKEND", "auto")
+    is_postgres = db.get_bind().dialect.name == "postgresql"
+
+    if choice == "postgres" or (choice == "auto" and is_postgres):
+        try:
+            pg_backend = PostgresTrigramSearch()
+            pg_backend.build(db)
+            backend = pg_backend
+            return
+        except Exception:
+            # Sin permisos para crear extensiones: se sigue con el índice en memoria
+            db.rollback()
+
+    backend = NgramIndex()
+    backend.build(db)
+
+
+def rebuild(db: Session):
+    """Vuelve a leer los nombres (otro proceso escribió el catálogo, ver indexes.py)."""
+    suggester.build(db)
+    if isinstance(backend, NgramIndex):
+        backend.build(db)
@@ -0,0 +1,59 @@
+"""Entorno Jinja2 único para main.py y todos los routers.
+
+Un solo Environment = una sola caché de plantillas compiladas. Además:
+
+- el bytecode compilado se guarda en disco (TEMPLATES_BYTECODE_DIR), así un
+  worker nuevo no vuelve a compilar lo que ya compiló otro;
+- precompile() carga todas las plantillas al arrancar (TEMPLATES_PRECOMPILE),
+  y la primera petición de cada página ya no paga la compilación;
+- auto_reload (comprobar si el .html cambió en cada render) solo con
+  TEMPLATES_AUTO_RELOAD=1, para desarrollo.
+"""
+import os
+import tempfile
+
+import jinja2
+from fastapi.templating import Jinja2Templates
+
+import assets
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+AUTO_RELOAD = os.getenv("TEMPLATES_AUTO_RELOAD", "0").lower() in ("1", "true", "yes")
+PRECOMPILE = os.getenv("TEMPLATES_PRECOMPILE", "1").lower() in ("1", "true", "yes")
+BYTECODE_DIR = os.getenv("TEMPLATES_BYTECODE_DIR", os.path.join(tempfile.gettempdir(), "drporo-jinja"))
+
+
+def _bytecode_cache():
+    # TEMPLATES_BYTECODE_DIR="" desactiva la caché en disco
+    if not BYTECODE_DIR:
+        return None
+    try:
+        os.makedirs(BYTECODE_DIR, exist_ok=True)
+    except OSError:
+        return None
+    return jinja2.FileSystemBytecodeCache(BYTECODE_DIR)
+
+
+env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+    autoescape=True,
+    auto_reload=AUTO_RELOAD,
+    bytecode_cache=_bytecode_cache(),
+    cache_size=-1,      # sin límite: son pocas plantillas y ninguna se expulsa
+)
+
+# {{ asset_url('style.css') }}: URL con huella (ver assets.py)
+env.globals["asset_url"] = assets.asset_url
+
+templates = Jinja2Templates(env=env)
+
+
+def precompile():
+    """Compila (o lee del bytecode) todas las plantillas. Devuelve cuántas."""
+    if not PRECOMPILE:
+        return 0
+    names = [n for n in env.list_templates() if n.endswith(".html")]
+    for name in names:
+        env.get_template(name)
+    return len(names)
@@ -0,0 +1,73 @@
+"""Base SQLite temporal para los tests.
+
+database.py crea el engine al importarse, así que la URL va al entorno
+antes de importar nada del proyecto. Versiones, índices y ranking se ponen
+al día en el momento (sin esperas ni tareas de fondo) para que cada test vea
+sus escrituras sin dormir.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="drporo-tests-")
+DB_PATH = os.path.join(_TMP, "drporo.db")
+
+for var in ("POSTGRESQL_ADDON_HOST", "POSTGRESQL_ADDON_PORT", "POSTGRESQL_ADDON_USER",
+            "POSTGRESQL_ADDON_PASSWORD", "POSTGRESQL_ADDON_DB"):
+    os.environ.pop(var, None)
+os.environ["POSTGRESQL_ADDON_URI"] = f"sqlite:///{DB_PATH}"
+os.environ["DB_ASYNC"] = "0"
+os.environ["VERSIONS_SYNC_SECONDS"] = "0"
+os.environ["INDEX_SYNC_SECONDS"] = "0"
+os.environ["LEADERBOARD_REFRESH_SECONDS"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import database, indexes, schemas
+from cache import catalog_cache, page_cache
+from http_cache import versions
+
+
+@pytest.fixture
+def fresh_db():
+    """Base vacía y migrada, y el estado en memoria del proceso a cero."""
+    database.engine.dispose()
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    database.init_db()
+
+    versions.__init__()
+    catalog_cache.clear()
+    page_cache.clear()
+    with database.SessionLocal() as db:
+        indexes.load_all(db)
+    yield
+    database.engine.dispose()
+
+
+@pytest.fixture
+def db(fresh_db):
+    with database.SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def client(fresh_db):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def champion(nombre: str, rol: str = "Mid", tasa_victoria: float = 50.0) -> schemas.ChampionCreate:
+    return schemas.ChampionCreate(nombre=nombre, rol=rol, tasa_victoria=tasa_victoria,
+                                  tasa_seleccion=0.0, tasa_baneo=0.0, activo=True)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    database.engine.dispose()
+    shutil.rmtree(_TMP, ignore_errors=True)
@@ -0,0 +1,93 @@
+"""Versiones compartidas entre procesos (cache_versions), ETag e índices en memoria."""
+import crud, database, indexes, models, search
+from http_cache import Versions, versions
+from tests.conftest import champion
+
+
+def write_from_other_process(nombre: str) -> int:
+    """Lo que haría bulk.py en otro proceso: escribe sin pasar por crud y sube su propia versión."""
+    with database.SessionLocal() as db:
+        nuevo = models.Champion(**champion(nombre).dict())
+        db.add(nuevo)
+        db.commit()
+        champion_id = nuevo.id
+    Versions().bump("champions", champion_id)
+    return champion_id
+
+
+def test_bump_is_visible_from_another_instance(fresh_db):
+    escritor, lector = Versions(), Versions()
+    escritor.bump("items", 7)
+    escritor.bump("champions", 3)
+
+    lector.sync()
+    for key in ("items", ("items", 7), "champions", ("champions", 3)):
+        assert lector.get(key)[0] == escritor.get(key)[0] > 0
+    assert lector.get("items")[0] < lector.get("champions")[0]
+    assert lector.pop_external() == {"items", "champions"}
+
+    # Lo que escribió la propia instancia no cuenta como externo
+    escritor.sync()
+    assert escritor.pop_external() == set()
+
+    # Solo se leen las filas nuevas
+    escritor.bump("items")
+    lector.sync()
+    assert lector.get("items")[0] == escritor.get("items")[0]
+    assert lector.pop_external() == {"items"}
+
+
+def test_token_changes_after_outside_write(fresh_db):
+    antes, _ = versions.token(["champions"])
+    write_from_other_process("Ahri")
+    despues, _ = versions.token(["champions"])
+    assert antes != despues
+
+
+def test_stale_etag_is_not_answered_with_304(client, db):
+    crud.create_champion(db, champion("Ahri"))
+
+    primera = client.get("/champions/")
+    assert primera.status_code == 200
+    etag = primera.headers["ETag"]
+    assert client.get("/champions/", headers={"If-None-Match": etag}).status_code == 304
+
+    champion_id = write_from_other_process("Zed")
+
+    segunda = client.get("/champions/", headers={"If-None-Match": etag})
+    assert segunda.status_code == 200
+    assert segunda.headers["ETag"] != etag
+    # El ETag nuevo va con los datos nuevos, no con la copia de catalog_cache
+    assert champion_id in [c["id"] for c in segunda.json()]
+    assert client.get("/champions/", headers={"If-None-Match": segunda.headers["ETag"]}).status_code == 304
+
+
+def test_entity_etag_only_changes_for_that_entity(client, db):
+    ahri = crud.create_champion(db, champion("Ahri"))
+    zed = crud.create_champion(db, champion("Zed"))
+    etags = {c.id: client.get(f"/champions/{c.id}").headers["ETag"] for c in (ahri, zed)}
+
+    Versions().bump("champions", zed.id)
+
+    assert client.get(f"/champions/{ahri.id}", headers={"If-None-Match": etags[ahri.id]}).status_code == 304
+    assert client.get(f"/champions/{zed.id}", headers={"If-None-Match": etags[zed.id]}).status_code == 200
+
+
+def test_indexes_reload_after_outside_write(db):
+    crud.create_champion(db, champion("Ahri"))
+    assert search.backend.search(db, "Ahri")["champions"]
+
+    champion_id = write_from_other_process("Malzahar")
+    assert search.backend.search(db, "Malzahar")["champions"] == []
+
+    assert indexes.reload_changed() == {"champions"}
+    assert search.backend.search(db, "Malzahar")["champions"] == [champion_id]
+    assert [s["nombre"] for s in search.suggester.suggest("malz")] == ["Malzahar"]
+
+    # Sin escrituras nuevas no se recarga nada
+    assert indexes.reload_changed() == set()
+
+
+def test_own_writes_do_not_reload_indexes(db):
+    crud.create_champion(db, champion("Ahri"))
+    assert indexes.reload_changed() == set()
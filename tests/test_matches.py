@@ -0,0 +1,153 @@
+"""Ingesta de partidas (matches.py) contra un recálculo desde cero."""
+import random
+from collections import Counter
+
+import pytest
+
+import crud, matches, models, schemas
+from tests.conftest import champion
+
+N_CHAMPIONS = 12
+N_ITEMS = 8
+
+
+@pytest.fixture
+def catalog(db):
+    champions = [crud.create_champion(db, champion(f"Campeón {n}", tasa_victoria=50.0)) for n in range(N_CHAMPIONS)]
+    items = [crud.create_item(db, schemas.ItemCreate(nombre=f"Ítem {n}")) for n in range(N_ITEMS)]
+    return [c.id for c in champions], [i.id for i in items]
+
+
+def random_matches(rng, champion_ids, item_ids, n):
+    partidas = []
+    for _ in range(n):
+        elegidos = rng.sample(champion_ids, 8)
+        equipo = lambda ids: [{"champion_id": c, "items": rng.sample(item_ids, rng.randint(0, 3))} for c in ids]
+        partidas.append({
+            "azul": equipo(elegidos[:3]),
+            "rojo": equipo(elegidos[3:6]),
+            "baneos": elegidos[6:],
+            "ganador": rng.choice(["azul", "rojo"]),
+        })
+    return partidas
+
+
+def invalid_matches(champion_ids, item_ids):
+    a, b, c, d = champion_ids[:4]
+    return [
+        # el mismo campeón dos veces, en equipos distintos y en el mismo
+        {"azul": [{"champion_id": a}], "rojo": [{"champion_id": a}], "ganador": "azul"},
+        {"azul": [{"champion_id": a}, {"champion_id": a}], "rojo": [{"champion_id": b}], "ganador": "rojo"},
+        # ids que no existen
+        {"azul": [{"champion_id": 99999}], "rojo": [{"champion_id": b}], "ganador": "azul"},
+        {"azul": [{"champion_id": a}], "rojo": [{"champion_id": b}], "baneos": [99999], "ganador": "azul"},
+        {"azul": [{"champion_id": c, "items": [99999]}], "rojo": [{"champion_id": d}], "ganador": "rojo"},
+        # schema inválido
+        {"azul": [{"champion_id": c}], "rojo": [{"champion_id": d}], "ganador": "verde"},
+        "no es json",
+    ]
+
+
+def from_scratch(partidas):
+    """Las mismas tasas contadas directamente sobre todas las partidas."""
+    jugadas, victorias, baneos = Counter(), Counter(), Counter()
+    con_item, pares, pares_ganados = Counter(), Counter(), Counter()
+
+    for p in partidas:
+        for lado, rival in (("azul", "rojo"), ("rojo", "azul")):
+            gano = p["ganador"] == lado
+            for part in p[lado]:
+                jugadas[part["champion_id"]] += 1
+                victorias[part["champion_id"]] += gano
+                for item in set(part["items"]):
+                    con_item[part["champion_id"], item] += 1
+                for otro in p[rival]:
+                    pares[part["champion_id"], otro["champion_id"]] += 1
+                    pares_ganados[part["champion_id"], otro["champion_id"]] += gano
+        for c in set(p["baneos"]):
+            baneos[c] += 1
+
+    total = len(partidas)
+    return {
+        "total": total,
+        "campeones": {
+            c: {"muestras": jugadas[c], "baneos": baneos[c],
+                "tasa_victoria": 100.0 * victorias[c] / jugadas[c] if jugadas[c] else None,
+                "tasa_seleccion": 100.0 * jugadas[c] / total, "tasa_baneo": 100.0 * baneos[c] / total}
+            for c in set(jugadas) | set(baneos)
+        },
+        "builds": {k: (100.0 * n / jugadas[k[0]], jugadas[k[0]]) for k, n in con_item.items()},
+        "cvc": {k: (100.0 * pares_ganados[k] / n, n) for k, n in pares.items()},
+    }
+
+
+def assert_matches_recomputation(db, partidas, champion_ids):
+    esperado = from_scratch(partidas)
+    assert crud.get_matches_played(db) == esperado["total"]
+
+    for c in db.query(models.Champion).filter(models.Champion.id.in_(champion_ids)):
+        e = esperado["campeones"].get(c.id)
+        if e is None:
+            assert (c.muestras, c.baneos) == (0, 0)
+            continue
+        assert (c.muestras, c.baneos) == (e["muestras"], e["baneos"])
+        assert c.tasa_seleccion == pytest.approx(e["tasa_seleccion"])
+        assert c.tasa_baneo == pytest.approx(e["tasa_baneo"])
+        # Un campeón solo baneado conserva la tasa de victoria que tenía
+        assert c.tasa_victoria == pytest.approx(50.0 if e["tasa_victoria"] is None else e["tasa_victoria"])
+
+    builds = {(b.champion_id, b.item_id): (b.porcentaje_uso, b.muestras) for b in db.query(models.ChampionItem)}
+    assert builds.keys() == esperado["builds"].keys()
+    for key, (porcentaje, muestras) in esperado["builds"].items():
+        assert builds[key] == (pytest.approx(porcentaje), muestras)
+
+    cvc = {(m.champion_id, m.oponente_id): (m.winrate, m.muestras) for m in db.query(models.ChampionVsChampion)}
+    assert cvc.keys() == esperado["cvc"].keys()
+    for key, (winrate, muestras) in esperado["cvc"].items():
+        assert cvc[key] == (pytest.approx(winrate), muestras)
+
+
+def test_two_batches_match_recomputation(db, catalog):
+    champion_ids, item_ids = catalog
+    rng = random.Random(23)
+    primero = random_matches(rng, champion_ids, item_ids, 40)
+    segundo = random_matches(rng, champion_ids, item_ids, 35)
+
+    report = matches.ingest(db, primero, batch_size=16)
+    assert (report["recibidas"], report["ingeridas"], report["rechazadas"]) == (40, 40, 0)
+    assert report["partidas_totales"] == 40
+    db.expire_all()
+    assert_matches_recomputation(db, primero, champion_ids)
+
+    # El segundo lote se suma a lo guardado, con otro tamaño de lote
+    report = matches.ingest(db, segundo, batch_size=7)
+    assert (report["recibidas"], report["ingeridas"], report["rechazadas"]) == (35, 35, 0)
+    assert report["partidas_totales"] == 75
+    db.expire_all()
+    assert_matches_recomputation(db, primero + segundo, champion_ids)
+
+
+def test_invalid_matches_are_rejected(db, catalog):
+    champion_ids, item_ids = catalog
+    rng = random.Random(5)
+    validas = random_matches(rng, champion_ids, item_ids, 10)
+    invalidas = invalid_matches(champion_ids, item_ids)
+
+    mezcla = validas[:5] + invalidas + validas[5:]
+    report = matches.ingest(db, mezcla, batch_size=4)
+    assert report["recibidas"] == len(mezcla)
+    assert report["ingeridas"] == len(validas)
+    assert report["rechazadas"] == len(invalidas)
+
+    # Las rechazadas no cuentan en ningún total
+    db.expire_all()
+    assert_matches_recomputation(db, validas, champion_ids)
+
+
+def test_batch_of_only_invalid_matches_writes_nothing(db, catalog):
+    champion_ids, item_ids = catalog
+    report = matches.ingest(db, invalid_matches(champion_ids, item_ids))
+    assert report["ingeridas"] == 0
+    assert report["partidas_totales"] == 0
+    assert db.query(models.ChampionVsChampion).count() == 0
+    assert db.query(models.ChampionItem).count() == 0
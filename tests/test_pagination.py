@@ -0,0 +1,105 @@
+"""Paginación por cursor (pagination.py) en la API y en el ranking."""
+import base64
+
+import pytest
+
+import crud, leaderboard, pagination
+from tests.conftest import champion
+
+
+def walk(client, url):
+    """Sigue el Link rel="next" hasta la última página; devuelve los ids de cada página."""
+    pages = []
+    while url:
+        assert len(pages) < 20, "el cursor no avanza"
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append([c["id"] for c in response.json()])
+        link = response.headers.get("Link")
+        url = link[1:link.index(">")] if link else None
+    return pages
+
+
+def test_pages_cover_every_row_once_in_order(client, db):
+    ids = [crud.create_champion(db, champion(f"Campeón {n}")).id for n in range(8)]
+
+    pages = walk(client, "/champions/?limit=3")
+    assert [len(p) for p in pages] == [3, 3, 2]
+    assert sum(pages, []) == sorted(ids)
+
+
+def test_link_header_keeps_the_other_params(client, db):
+    for n in range(3):
+        crud.create_champion(db, champion(f"Campeón {n}"))
+
+    response = client.get("/champions/?limit=2&include_inactive=true")
+    cursor = response.headers["X-Next-Cursor"]
+    assert response.headers["Link"] == f'</champions/?limit=2&include_inactive=true&cursor={cursor}>; rel="next"'
+
+
+def test_writes_between_pages_do_not_shift_the_next_page(client, db):
+    ids = [crud.create_champion(db, champion(f"Campeón {n}")).id for n in range(7)]
+
+    first = client.get("/champions/?limit=3")
+    assert [c["id"] for c in first.json()] == ids[:3]
+
+    # Con offset, borrar una fila ya vista haría saltarse ids[3]
+    crud.soft_delete_champion(db, ids[0])
+    nuevo = crud.create_champion(db, champion("Nuevo")).id
+
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(f"/champions/?limit=3&cursor={cursor}")
+    assert [c["id"] for c in second.json()] == ids[3:6]
+
+    cursor = second.headers["X-Next-Cursor"]
+    third = client.get(f"/champions/?limit=3&cursor={cursor}")
+    assert [c["id"] for c in third.json()] == [ids[6], nuevo]
+    assert "X-Next-Cursor" not in third.headers
+
+
+def test_last_full_page_ends_with_an_empty_one(client, db):
+    for n in range(4):
+        crud.create_champion(db, champion(f"Campeón {n}"))
+
+    pages = walk(client, "/champions/?limit=2")
+    assert [len(p) for p in pages] == [2, 2, 0]
+
+
+INVALID = [
+    "!!!",
+    base64.urlsafe_b64encode(b"{}").decode(),    # JSON, pero no una lista
+    base64.urlsafe_b64encode(b"[1,").decode(),   # JSON cortado
+    pagination.encode_cursor(1, 2),              # número de columnas equivocado
+]
+
+
+@pytest.mark.parametrize("cursor", INVALID)
+@pytest.mark.parametrize("path", ["/champions/", "/champions/api/deleted", "/champions/list",
+                                  "/champions/deleted", "/items/", "/cvc/"])
+def test_invalid_cursor_is_400(client, path, cursor):
+    response = client.get(path, params={"cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_leaderboard_pages_keep_ranking_order_with_ties(db):
+    # Empates de tasa_victoria: el orden lo decide el id y el cursor usa el puesto
+    for n, (rol, tasa) in enumerate([("Mid", 55.0), ("Top", 50.0), ("Mid", 50.0), ("Adc", 50.0),
+                                     ("Mid", 48.0), ("Top", 55.0), ("Sup", 50.0)]):
+        crud.create_champion(db, champion(f"Campeón {n}", rol=rol, tasa_victoria=tasa))
+    leaderboard.refresh_now()
+
+    for rol in (None, "Mid"):
+        completo = leaderboard.list_page(db, rol, 100)
+        key = lambda e: (e.puesto_rol if rol else e.puesto,)
+        paginado, after = [], None
+        while True:
+            page = leaderboard.list_page(db, rol, 2, after)
+            paginado += page
+            cursor = pagination.next_cursor(page, 2, key)
+            if cursor is None:
+                break
+            after = pagination.decode_cursor(cursor)
+
+        assert [e.champion_id for e in paginado] == [e.champion_id for e in completo]
+        tasas = [(-e.tasa_victoria, -e.champion_id) for e in completo]
+        assert tasas == sorted(tasas)
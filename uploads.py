@@ -0,0 +1,97 @@
+"""Subida de fotos de perfil.
+
+El archivo se copia a disco por trozos y sin bloquear el event loop
+(aiofiles), calculando el sha256 a la vez. El nombre final es ese hash, así
+dos subidas iguales comparten archivo y dos distintas con el mismo nombre ya
+no se pisan. La miniatura que muestran las páginas se genera después de
+responder (BackgroundTasks), en un hilo.
+"""
+import hashlib
+import os
+import uuid
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageOps
+
+UPLOAD_DIR = "static/uploads"
+THUMB_DIR = os.path.join(UPLOAD_DIR, "thumbs")
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "256"))
+CHUNK_SIZE = 64 * 1024
+
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+
+async def save_upload(foto: UploadFile):
+    """Guarda la foto y devuelve su ruta ("static/uploads/<sha256>.<ext>"), o None si no se envió."""
+    if foto is None or not foto.filename:
+        return None
+
+    ext = EXTENSIONS.get(foto.content_type)
+    if ext is None:
+        raise HTTPException(415, f"Formato de imagen no soportado: {foto.content_type}")
+
+    await aiofiles.os.makedirs(UPLOAD_DIR, exist_ok=True)
+    tmp_path = os.path.join(UPLOAD_DIR, f".{uuid.uuid4().hex}.part")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            while chunk := await foto.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(413, f"La foto supera el máximo de {MAX_UPLOAD_BYTES // 1024} KB")
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        await aiofiles.os.remove(tmp_path)
+        raise
+
+    path = os.path.join(UPLOAD_DIR, digest.hexdigest() + ext)
+    if await aiofiles.os.path.exists(path):
+        # Misma foto ya subida: se reutiliza
+        await aiofiles.os.remove(tmp_path)
+    else:
+        await aiofiles.os.replace(tmp_path, path)
+    return path
+
+
+def thumbnail_path(path: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(THUMB_DIR, f"{name}.webp")
+
+
+def make_thumbnail(path: str):
+    """Miniatura cuadrada en WebP. Se llama como tarea de fondo tras la respuesta."""
+    target = thumbnail_path(path)
+    if os.path.exists(target):
+        return
+
+    os.makedirs(THUMB_DIR, exist_ok=True)
+    try:
+        with Image.open(path) as img:
+            img = ImageOps.exif_transpose(img)
+            img = ImageOps.fit(img.convert("RGB"), (THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            tmp = target + ".part"
+            img.save(tmp, "WEBP", quality=80)
+            os.replace(tmp, target)
+    except (OSError, Image.DecompressionBombError):
+        # No es una imagen válida: la página sigue mostrando el original
+        pass
+
+
+def display_path(path):
+    """Lo que deben mostrar las páginas: la miniatura si ya existe, si no el original."""
+    if not path:
+        return None
+    thumb = thumbnail_path(path)
+    return thumb if os.path.exists(thumb) else path